@@ -5,54 +5,590 @@ Description:
 This Python project simulates the operation of a coffee vending machine. The program allows users to select drinks, manage ingredient levels, and process payments in euros. It includes features such as:
 
 Interactive menu for selecting coffee types (Espresso, Latte, Cappuccino).
-Real-time tracking of ingredient levels (water, milk, coffee, and sugar) in the machine’s reservoir.
-Coin-based payment processing with proper calculation of total payment and change returned.
+Real-time tracking of ingredient levels (water, milk, coffee, and sugar) in the machine’s reservoir, with an operator refill option.
+Coin-based payment processing with integer-cent accounting and minimal-coin change from the machine's own coin inventory.
 Automatic validation of available ingredients before serving drinks, ensuring proper resource management.
 Machine state updates after each transaction, including total revenue and drinks served.
+Demand forecasting that refuses unservable drinks before payment and predicts when to refill.
+Optional persistent state through an append-only transaction log (see coffee_journal.py).
+Optional live metrics (orders, rejections, revenue, stage latencies) served over HTTP (see coffee_metrics.py).
 A final machine report displaying the current status of resources, total earnings, and sales statistics upon shutdown.
+Headless batch replay of recorded orders through CoffeeMachine.process_orders().
 
 """
+import math
+import os
+import time
+from array import array
+from collections.abc import Mapping
+from operator import add, ge, mul, sub
+
+from game_input import ask, choice, integer
+from instrumentation import instrumented
+
+
+def format_euro(cents):
+    """Formats an amount of euro cents for display, e.g. 250 -> '€2.50'."""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}€{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def print_report(report):
+    """
+    Displays a machine report as returned by CoffeeMachine.report_data():
+    reservoir levels, total money, coins held and drinks served count.
+    """
+    print("\n===== MACHINE REPORT =====\n")
+    print("Reservoir Levels:")
+
+    for ingredient, details in report["reservoir"].items():
+        current = details["current_level"]
+        capacity = details["capacity"]
+        unit = details["unit"]
+        percentage = (current / capacity) * 100
+        print(f"> {ingredient.title()}: {current}/{capacity} {unit} ({percentage:.1f}%)")
+
+    print(f"\nTotal Money in Machine: {format_euro(report['money'])}")
+    print("\nCoins Held:")
+    for name, count in report["coins"].items():
+        print(f"  {name.replace('_', ' ').title()}: {count}")
+    print("\nDrinks Served:")
+    for drink, count in report["drinks_served"].items():
+        print(f"  {drink.title()}: {count}")
+    print()
+
+# Outcome codes reported by CoffeeMachine.process_orders()
+SERVED = 0
+REJECTED_UNKNOWN_DRINK = 1
+REJECTED_INSUFFICIENT_FUNDS = 2
+REJECTED_INSUFFICIENT_INGREDIENTS = 3
+REJECTED_NO_CHANGE = 4
+REJECTED_INVALID_COINS = 5
+
+OUTCOME_LABELS = {
+    SERVED: "served",
+    REJECTED_UNKNOWN_DRINK: "unknown_drink",
+    REJECTED_INSUFFICIENT_FUNDS: "insufficient_funds",
+    REJECTED_INSUFFICIENT_INGREDIENTS: "insufficient_ingredients",
+    REJECTED_NO_CHANGE: "no_change",
+    REJECTED_INVALID_COINS: "invalid_coins",
+}
+
+# Coins of one denomination accepted per order, which bounds the change a sale can need
+MAX_COINS_PER_DENOMINATION = 20
+
+# Stages of one run() loop iteration, timed when metrics are attached
+STAGE_CHOICE = 0
+STAGE_MENU = 1
+STAGE_PAYMENT = 2
+STAGE_CHANGE = 3
+STAGE_DISPENSE = 4
+STAGE_REPORT = 5
+
+STAGE_LABELS = {
+    STAGE_CHOICE: "choice",
+    STAGE_MENU: "menu",
+    STAGE_PAYMENT: "payment",
+    STAGE_CHANGE: "change",
+    STAGE_DISPENSE: "dispense",
+    STAGE_REPORT: "report",
+}
+
+
+class OrderBatchResult:
+    """
+    Result of a headless batch of orders.
+    Outcomes and change are stored in compact arrays, one entry per order,
+    in the same order the orders were given.
+    """
+    def __init__(self, outcomes, change, reservoir, machine_state):
+        self.outcomes = outcomes            # array('B') of outcome codes
+        self.change = change                # array('q') of change returned (cents)
+        self.reservoir = reservoir          # Final reservoir levels {ingredient: level}
+        self.machine_state = machine_state  # Final copy of the machine state
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    @property
+    def served(self):
+        return self.outcomes.count(SERVED)
+
+    @property
+    def rejected(self):
+        return len(self.outcomes) - self.served
+
+    def summary(self):
+        """Returns the number of orders per outcome label."""
+        return {label: self.outcomes.count(code) for code, label in OUTCOME_LABELS.items()}
+
+
+class CoinChanger:
+    """
+    Tracks the coins held by the machine and dispenses minimal-coin change.
+
+    The minimal-coin breakdown of every amount up to `max_change` cents is
+    precomputed once with dynamic programming, so giving change is a table
+    lookup plus an inventory check. Only when the machine runs short of a
+    coin used by the optimal breakdown, or is asked for more than `max_change`,
+    does it fall back to a bounded search over the coins it actually holds;
+    its results, failures included, are cached per inventory state.
+    The tables are shared by every changer with the same denominations and
+    are only extended when a changer with a larger `max_change` is built.
+    """
+    # {coin values: (solutions, min_coins)}
+    _tables = {}
+
+    # Bounded-search results kept per changer before the cache is cleared
+    FALLBACK_CACHE_SIZE = 4096
+
+    def __init__(self, denominations, inventory, max_change=1000):
+        self.names = tuple(denominations)
+        self.values = tuple(denominations.values())
+        self.counts = [inventory.get(name, 0) for name in self.names]
+        self._zero = (0,) * len(self.values)
+        tables = self._tables.get(self.values)
+        if tables is None:
+            tables = self._tables[self.values] = ([self._zero], [0])
+        self._solutions, self._min_coins = tables
+        # Denomination indexes, largest value first, for the bounded search
+        self._descending = sorted(range(len(self.values)), key=self.values.__getitem__, reverse=True)
+        self._fallback = {}  # {(amount, coin counts): change or None}
+        if len(self._solutions) <= max_change:
+            self._extend_table(max_change)
+
+    @property
+    def inventory(self):
+        """Coins currently held, per denomination name."""
+        return dict(zip(self.names, self.counts))
+
+    @property
+    def total(self):
+        """Value of all coins currently held, in cents."""
+        return sum(map(mul, self.counts, self.values))
+
+    def deposit(self, coins):
+        """Adds inserted coins (counts per denomination) to the inventory."""
+        self.counts[:] = map(add, self.counts, coins)
+
+    def withdraw(self, coins):
+        """Removes coins (counts per denomination) from the inventory."""
+        self.counts[:] = map(sub, self.counts, coins)
+
+    def pay(self, coins, amount_due):
+        """
+        Takes the inserted coins and dispenses change for `amount_due` cents.
+        Returns the change as coin counts per denomination, or None when the
+        machine can't give exact change (the inserted coins are then kept out
+        of the inventory, i.e. returned to the customer).
+        """
+        self.deposit(coins)
+        change = self.make_change(sum(map(mul, coins, self.values)) - amount_due)
+        if change is None:
+            self.withdraw(coins)
+        return change
+
+    def make_change(self, amount):
+        """
+        Dispenses `amount` cents with as few coins as the inventory allows.
+        Returns coin counts per denomination, or None if it can't be done.
+        """
+        if amount < 0 or amount > self.total:
+            return None
+
+        # The shared table only grows when a changer is built, never from a sale;
+        # larger amounts go straight to the search over the coins held
+        change = self._solutions[amount] if amount < len(self._solutions) else None
+        if change is None or not all(map(ge, self.counts, change)):
+            key = (amount, tuple(self.counts))
+            if key in self._fallback:
+                change = self._fallback[key]
+            else:
+                if len(self._fallback) >= self.FALLBACK_CACHE_SIZE:
+                    self._fallback.clear()
+                change = self._fallback[key] = self._bounded_change(amount)
+            if change is None:
+                return None
+
+        self.withdraw(change)
+        return change
+
+    def _extend_table(self, max_amount):
+        """Extends the unbounded minimal-coin table up to `max_amount` cents."""
+        solutions = self._solutions
+        min_coins = self._min_coins
+        values = self.values
+        for amount in range(len(solutions), max_amount + 1):
+            best_index = None
+            best_count = None
+            for index, value in enumerate(values):
+                if value <= amount:
+                    count = min_coins[amount - value]
+                    if count is not None and (best_count is None or count < best_count):
+                        best_index, best_count = index, count
+            if best_index is None:
+                solutions.append(None)
+                min_coins.append(None)
+                continue
+            previous = list(solutions[amount - values[best_index]])
+            previous[best_index] += 1
+            solutions.append(tuple(previous))
+            min_coins.append(best_count + 1)
+
+    def _bounded_change(self, amount):
+        """
+        Minimal-coin change limited to the coins in the inventory.
+        Depth-first over the denominations, largest first, with the fewest
+        coins for each (denomination, remaining amount) memoised. Branches
+        that can't beat the best so far are cut off, and so are amounts the
+        smaller coins held can't add up to (too much, or not a multiple of
+        their common divisor).
+        """
+        values = self.values
+        counts = self.counts
+        descending = self._descending
+        last = len(descending) - 1
+        memo = {}  # {(position, remaining): (coins, coins of this denomination) or None}
+
+        # Value and common divisor of the coins held from each position down (0 past the end)
+        held_value = [0] * (last + 2)
+        divisor = [0] * (last + 2)
+        for position in range(last, -1, -1):
+            index = descending[position]
+            held_value[position] = held_value[position + 1] + values[index] * counts[index]
+            divisor[position] = math.gcd(divisor[position + 1], values[index]) if counts[index] else divisor[position + 1]
+
+        def fewest(position, remaining):
+            key = (position, remaining)
+            if key in memo:
+                return memo[key]
+            if remaining > held_value[position] or remaining % divisor[position]:
+                memo[key] = None
+                return None
+            index = descending[position]
+            value = values[index]
+            most = min(counts[index], remaining // value)
+            best = None
+            if position == last:
+                if most * value == remaining:
+                    best = (most, most)
+            else:
+                next_value = values[descending[position + 1]]
+                # Using fewer would leave more than the smaller coins are worth
+                least = max(0, -(-(remaining - held_value[position + 1]) // value))
+                for used in range(most, least - 1, -1):
+                    rest = remaining - used * value
+                    # Fewer coins of this denomination never lowers this bound, so stop once it can't win
+                    if best is not None and used - (-rest // next_value) >= best[0]:
+                        break
+                    found = (0,) if rest == 0 else fewest(position + 1, rest)
+                    if found is not None and (best is None or used + found[0] < best[0]):
+                        best = (used + found[0], used)
+            memo[key] = best
+            return best
+
+        if amount == 0:
+            return self._zero
+        if fewest(0, amount) is None:
+            return None
+        change = list(self._zero)
+        remaining = amount
+        for position, index in enumerate(descending):
+            if remaining == 0:
+                break
+            used = memo[(position, remaining)][1]
+            change[index] = used
+            remaining -= used * values[index]
+        return tuple(change)
+
+
+class IngredientRegistry:
+    """
+    Fixed mapping of ingredient names (and units) to array indices.
+    Registries are interned, so machines with the same reservoir layout share one.
+    """
+    __slots__ = ("names", "units", "index")
+    _interned = {}
+
+    def __new__(cls, names, units):
+        key = (tuple(names), tuple(units))
+        registry = cls._interned.get(key)
+        if registry is None:
+            registry = super().__new__(cls)
+            registry.names, registry.units = key
+            registry.index = {name: position for position, name in enumerate(registry.names)}
+            cls._interned[key] = registry
+        return registry
+
+    def __len__(self):
+        return len(self.names)
+
+    def vector(self, amounts):
+        """
+        Converts {ingredient: amount} into a full-width integer array.
+        Returns None if an ingredient is not part of the registry.
+        """
+        vector = array('l', [0]) * len(self.names)
+        for name, amount in amounts.items():
+            position = self.index.get(name)
+            if position is None:
+                return None
+            vector[position] = amount
+        return vector
+
+
+class Reservoir(Mapping):
+    """
+    Array-backed reservoir: current levels and capacities are integer arrays
+    indexed through an IngredientRegistry. A recipe compiled with recipe()
+    is checked and deducted with one vector subtract-and-compare in draw().
+
+    Reads like the original dict of dicts, e.g.
+    reservoir["milk"]["current_level"] or reservoir.items().
+    """
+    __slots__ = ("registry", "levels", "capacities")
+
+    def __init__(self, layout):
+        self.registry = IngredientRegistry(layout, (detail["unit"] for detail in layout.values()))
+        self.levels = array('l', (detail["current_level"] for detail in layout.values()))
+        self.capacities = array('l', (detail["capacity"] for detail in layout.values()))
+
+    def __getitem__(self, ingredient):
+        return IngredientLevel(self, self.registry.index[ingredient])
+
+    def __iter__(self):
+        return iter(self.registry.names)
+
+    def __len__(self):
+        return len(self.registry.names)
+
+    def recipe(self, ingredients):
+        """Compiles {ingredient: amount} into a vector, or None if an ingredient is unknown."""
+        return self.registry.vector(ingredients)
+
+    def draw(self, recipe):
+        """Deducts a compiled recipe if every level covers it. Returns True if deducted."""
+        remaining = array('l', map(sub, self.levels, recipe))
+        if min(remaining) < 0:
+            return False
+        self.levels = remaining
+        return True
+
+    def refill(self, ingredient=None):
+        """Refills one ingredient, or every ingredient, to capacity."""
+        if ingredient is None:
+            self.levels = array('l', self.capacities)
+        else:
+            position = self.registry.index[ingredient]
+            self.levels[position] = self.capacities[position]
+
+
+class IngredientLevel(Mapping):
+    """Dict-like view of one ingredient in a Reservoir (current_level, capacity, unit)."""
+    __slots__ = ("_reservoir", "_position")
+    _keys = ("capacity", "current_level", "unit")
+
+    def __init__(self, reservoir, position):
+        self._reservoir = reservoir
+        self._position = position
+
+    def __getitem__(self, key):
+        if key == "current_level":
+            return self._reservoir.levels[self._position]
+        if key == "capacity":
+            return self._reservoir.capacities[self._position]
+        if key == "unit":
+            return self._reservoir.registry.units[self._position]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "current_level":
+            self._reservoir.levels[self._position] = value
+        elif key == "capacity":
+            self._reservoir.capacities[self._position] = value
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class DemandForecaster:
+    """
+    Forecasts reservoir depletion from the drinks a machine serves.
+
+    Sales rates per drink and consumption rates per ingredient are
+    exponentially decayed averages (per second) with a common half-life.
+    Weights are stored relative to a fixed landmark time, so recording a
+    sale only adds to the weights of that drink and its ingredients: no
+    decay pass over the other rates is needed.
+    """
+    def __init__(self, machine, half_life=3600.0, clock=time.monotonic):
+        self.machine = machine
+        self.clock = clock
+        self._decay = math.log(2) / half_life
+        self._landmark = clock()
+        self._drink_weights = {}
+        self._ingredient_weights = [0.0] * len(machine.reservoir)
+        self._seen = dict(machine.machine_state["drinks_served"])
+
+    def record_sale(self, drink, count=1):
+        """Records `count` servings of `drink` at the current time."""
+        now = self.clock()
+        exponent = self._decay * (now - self._landmark)
+        if exponent > 50:
+            self._rescale(now)
+            exponent = 0.0
+        boost = count * self._decay * math.exp(exponent)
+
+        self._drink_weights[drink] = self._drink_weights.get(drink, 0.0) + boost
+        recipe = self.machine._recipe(drink)
+        if recipe is not None:
+            weights = self._ingredient_weights
+            for position, amount in enumerate(recipe):
+                if amount:
+                    weights[position] += amount * boost
+        self._seen[drink] = self._seen.get(drink, 0) + count
+
+    def reset(self):
+        """Forgets the recorded demand and starts again from the current machine state."""
+        self._landmark = self.clock()
+        self._drink_weights = {}
+        self._ingredient_weights = [0.0] * len(self.machine.reservoir)
+        self._seen = dict(self.machine.machine_state["drinks_served"])
+
+    def sync(self):
+        """Records the servings added to machine_state["drinks_served"] since the last update."""
+        for drink, count in self.machine.machine_state["drinks_served"].items():
+            new_servings = count - self._seen.get(drink, 0)
+            if new_servings > 0:
+                self.record_sale(drink, new_servings)
+
+    def demand_rates(self):
+        """Current servings per second for each drink."""
+        scale = self._scale()
+        return {drink: weight * scale for drink, weight in self._drink_weights.items()}
+
+    def consumption_rates(self):
+        """Current consumption per second for each ingredient."""
+        scale = self._scale()
+        return {name: weight * scale
+                for name, weight in zip(self.machine.reservoir, self._ingredient_weights)}
+
+    def time_to_empty(self):
+        """Projected seconds until each ingredient runs out (None without demand)."""
+        return {
+            name: (level / rate if rate > 0 else None)
+            for (name, rate), level in zip(self.consumption_rates().items(),
+                                           self.machine.reservoir.levels)
+        }
+
+    def can_serve(self, drink):
+        """True if the reservoir currently holds every ingredient of `drink`."""
+        recipe = self.machine._recipe(drink)
+        return recipe is not None and all(map(ge, self.machine.reservoir.levels, recipe))
+
+    def servable_drinks(self):
+        """Drinks on the menu that can be served with the current reservoir levels."""
+        return [drink for drink in self.machine.coffee_menu if self.can_serve(drink)]
+
+    def next_refill_eta(self):
+        """
+        Returns (ingredient, seconds) for the ingredient that will first drop
+        below the largest amount a single drink needs, i.e. the next refill an
+        operator has to make. Returns None while there is no demand.
+        """
+        reservoir = self.machine.reservoir
+        needed = [0] * len(reservoir)
+        for drink in self.machine.coffee_menu:
+            recipe = self.machine._recipe(drink)
+            if recipe is not None:
+                needed = list(map(max, needed, recipe))
+
+        eta = None
+        for (name, rate), level, threshold in zip(self.consumption_rates().items(),
+                                                  reservoir.levels, needed):
+            if rate <= 0 or not threshold:
+                continue
+            seconds = max(0.0, (level - threshold) / rate)
+            if eta is None or seconds < eta[1]:
+                eta = (name, seconds)
+        return eta
+
+    def _scale(self):
+        """Factor turning stored weights into rates at the current time."""
+        return math.exp(-self._decay * (self.clock() - self._landmark))
+
+    def _rescale(self, now):
+        """Moves the landmark to `now` to keep the stored weights small."""
+        factor = math.exp(-self._decay * (now - self._landmark))
+        self._drink_weights = {drink: weight * factor for drink, weight in self._drink_weights.items()}
+        self._ingredient_weights = [weight * factor for weight in self._ingredient_weights]
+        self._landmark = now
+
+
 class CoffeeMachine:
-    def __init__(self):
+    def __init__(self, clock=time.monotonic):
         # Menu of coffee drinks
         self.coffee_menu = {
             "espresso": {
                 "ingredients": {"water": 50, "coffee": 18},
-                "cost": 1.5
+                "cost": 150
             },
             "latte": {
                 "ingredients": {"water": 200, "milk": 150, "coffee": 24},
-                "cost": 2.5
+                "cost": 250
             },
             "cappuccino": {
                 "ingredients": {"water": 250, "milk": 100, "coffee": 24},
-                "cost": 3.0
+                "cost": 300
             }
         }
 
         # Reservoir status
-        self.reservoir = {
+        self.reservoir = Reservoir({
             "water": {"capacity": 2000, "current_level": 2000, "unit": "ml"},
             "milk": {"capacity": 1000, "current_level": 1000, "unit": "ml"},
             "coffee": {"capacity": 500, "current_level": 500, "unit": "grams"},
             "sugar": {"capacity": 300, "current_level": 300, "unit": "grams"}
+        })
+
+        # Recipes compiled to reservoir vectors (None if an ingredient is missing)
+        self.recipes = {
+            drink: self.reservoir.recipe(details["ingredients"])
+            for drink, details in self.coffee_menu.items()
         }
 
-        # Euro currency denominations
+        # Euro currency denominations (in cents)
         self.euro_currency = {
-            'one_cent': 0.01,
-            'two_cents': 0.02,
-            'five_cents': 0.05,
-            'ten_cents': 0.1,
-            'twenty_cents': 0.2,
-            'fifty_cents': 0.5,
-            'one_euro': 1,
-            'two_euro': 2
+            'one_cent': 1,
+            'two_cents': 2,
+            'five_cents': 5,
+            'ten_cents': 10,
+            'twenty_cents': 20,
+            'fifty_cents': 50,
+            'one_euro': 100,
+            'two_euro': 200
         }
 
+        # Coins available for change
+        self.changer = CoinChanger(self.euro_currency, {
+            'one_cent': 50,
+            'two_cents': 50,
+            'five_cents': 40,
+            'ten_cents': 40,
+            'twenty_cents': 30,
+            'fifty_cents': 20,
+            'one_euro': 10,
+            'two_euro': 10
+        })
+
         # State of the machine
         self.machine_state = {
-            "money": 0.0,
+            "money": 0,  # In cents
             "drinks_served": {
                 "espresso": 0,
                 "latte": 0,
@@ -60,6 +596,15 @@ class CoffeeMachine:
             }
         }
 
+        # Demand forecast and refill planning
+        self.forecaster = DemandForecaster(self, clock=clock)
+
+        # Transaction journal (see attach_journal)
+        self.journal = None
+
+        # Live metrics (see attach_metrics)
+        self.metrics = None
+
         # Machine power flag
         self.is_on = True
 
@@ -68,56 +613,218 @@ class CoffeeMachine:
         Main loop for the CoffeeMachine.
         Continues until the user chooses to turn off the machine.
         """
+        perf_counter = time.perf_counter
         while self.is_on:
+            self._commit_journal()
+            started = perf_counter()
             choice = self._get_user_choice()
+            self._record_stage(STAGE_CHOICE, started)
 
             if choice == 'c':
+                started = perf_counter()
                 drinks = self._get_machine_menus('c')  # Display coffee menu
                 if drinks:  # If valid drinks retrieved
                     selected_drink, drink_cost = self._get_drink_cost(drinks)
-                    total_inserted = self._get_payment()
-                    self._get_change(drink_cost, total_inserted)
+                    self._record_stage(STAGE_MENU, started)
+                    # Refuse before taking coins if the drink can't be made
+                    if not self.forecaster.can_serve(selected_drink):
+                        print(f"Sorry, {selected_drink.title()} is unavailable until the machine is refilled.\n")
+                        self._record_rejection(selected_drink)
+                        continue
+                    started = perf_counter()
+                    inserted_coins = self._get_payment()
+                    self._record_stage(STAGE_PAYMENT, started)
+                    started = perf_counter()
+                    paid = self._get_change(drink_cost, inserted_coins)
+                    self._record_stage(STAGE_CHANGE, started)
+                    if not paid:
+                        self._record_order(REJECTED_NO_CHANGE)
+                        continue
 
                     # Check if we can actually serve the drink
+                    started = perf_counter()
                     if self._check_and_update_reservoir(selected_drink):
                         self._update_machine_state(selected_drink)
+                        self._record_order(SERVED, drink_cost)
+                    else:
+                        self._refund(drink_cost)
+                        self._record_rejection(selected_drink)
+                    self._record_stage(STAGE_DISPENSE, started)
 
             elif choice == 'r':
                 # Reservoir report
+                started = perf_counter()
                 self._get_machine_menus('r')
+                self._record_stage(STAGE_REPORT, started)
+
+            elif choice == 'f':
+                # Operator refill of every reservoir to capacity
+                self.refill()
+                print("Reservoir refilled.\n")
 
             elif choice == 'o':
                 # Turn off the machine
                 self.is_on = False
                 print("Machine is turning off...")
+                if self.journal is not None:
+                    self.journal.close(self)
                 self._print_report()
             else:
                 # Fallback for invalid choice handling
                 print("Invalid input. Please try again.")
 
+    def attach_journal(self, journal):
+        """
+        Restores the machine from a TransactionJournal and records every
+        following transaction in it. Returns the number of log records replayed.
+        """
+        replayed = journal.restore(self)
+        self.journal = journal
+        return replayed
+
+    def attach_metrics(self, metrics):
+        """
+        Reports orders, rejections, revenue and run() stage latencies to a
+        CoffeeMetrics (see coffee_metrics.py) from now on. Returns the metrics.
+        """
+        self.metrics = metrics
+        return metrics
+
+    def refill(self, ingredient=None):
+        """Refills one ingredient, or the whole reservoir, to capacity."""
+        self.reservoir.refill(ingredient)
+        self._commit_journal()
+
+    def report_data(self):
+        """
+        Returns the data shown by the machine report as plain dicts:
+        reservoir levels, money (cents), coins held and drinks served.
+        """
+        return {
+            "reservoir": {
+                ingredient: {
+                    "current_level": detail["current_level"],
+                    "capacity": detail["capacity"],
+                    "unit": detail["unit"],
+                }
+                for ingredient, detail in self.reservoir.items()
+            },
+            "money": self.machine_state["money"],
+            "coins": self.changer.inventory,
+            "drinks_served": dict(self.machine_state["drinks_served"]),
+        }
+
+    def process_orders(self, orders):
+        """
+        Processes an iterable of (drink, coins) orders without any prompts.
+        `coins` holds the number of coins inserted per denomination, in the
+        order of `euro_currency` (1 cent ... 2 euro).
+
+        Follows the same rules as run(): an order is served only when the
+        payment covers the drink cost and the reservoir holds every ingredient.
+        Served orders deduct the reservoir and update machine_state; rejected
+        orders get their full payment back as change, and so does an order the
+        coin inventory can't give exact change for. An order with a negative
+        coin count, more than MAX_COINS_PER_DENOMINATION coins of a kind or the
+        wrong number of denominations is rejected without touching the coin
+        inventory.
+        Returns an OrderBatchResult.
+        """
+        coin_values = tuple(self.euro_currency.values())
+        pay = self.changer.pay
+        recipes = {
+            drink: (details["cost"], self._recipe(drink))
+            for drink, details in self.coffee_menu.items()
+        }
+        # Work on local copies for speed and write them back at the end
+        levels = self.reservoir.levels
+        drinks_served = self.machine_state["drinks_served"]
+        served_counts = dict.fromkeys(recipes, 0)
+        money = self.machine_state["money"]
+
+        outcomes = array('B')
+        change = array('q')
+        add_outcome = outcomes.append
+        add_change = change.append
+        metrics = self.metrics
+        starting_money = money
+
+        num_coins = len(coin_values)
+        for drink, coins in orders:
+            # Negative or missing coin counts would corrupt the coin inventory, and huge ones the change search
+            if len(coins) != num_coins or min(coins) < 0 or max(coins) > MAX_COINS_PER_DENOMINATION:
+                add_outcome(REJECTED_INVALID_COINS)
+                add_change(0)
+                continue
+            total_inserted = sum(map(mul, coins, coin_values))
+            recipe = recipes.get(drink)
+            if recipe is None:
+                add_outcome(REJECTED_UNKNOWN_DRINK)
+                add_change(total_inserted)
+                continue
+
+            cost, vector = recipe
+            if total_inserted < cost:
+                add_outcome(REJECTED_INSUFFICIENT_FUNDS)
+                add_change(total_inserted)
+                continue
+
+            # Vector subtract-and-compare against every reservoir level at once
+            remaining = array('l', map(sub, levels, vector)) if vector is not None else None
+            if remaining is None or min(remaining) < 0:
+                add_outcome(REJECTED_INSUFFICIENT_INGREDIENTS)
+                add_change(total_inserted)
+                if metrics is not None and remaining is not None:
+                    metrics.record_shortage(levels, vector)
+                continue
+            if pay(coins, cost) is None:
+                add_outcome(REJECTED_NO_CHANGE)
+                add_change(total_inserted)
+                continue
+            levels = remaining
+            money += cost
+            served_counts[drink] += 1
+            add_outcome(SERVED)
+            add_change(total_inserted - cost)
+
+        self.reservoir.levels = levels
+        for drink, count in served_counts.items():
+            drinks_served[drink] = drinks_served.get(drink, 0) + count
+        self.machine_state["money"] = money
+        self.forecaster.sync()
+        self._commit_journal()
+        if metrics is not None:
+            metrics.record_batch(outcomes, money - starting_money)
+
+        return OrderBatchResult(
+            outcomes,
+            change,
+            dict(zip(self.reservoir, levels)),
+            {"money": money, "drinks_served": dict(drinks_served)},
+        )
+
     # -------------------------
     #    PRIVATE METHODS
     # -------------------------
 
     def _get_user_choice(self):
         """
-        Presents and returns the user options: [C]offee Menu, [R]eservoir, [O]ff
+        Presents and returns the user options: [C]offee Menu, [R]eservoir, [F]ill Reservoir, [O]ff
         """
         print("---------------------")
         print("What would you like today?")
         print("---------------------")
 
-        choice = input("\n[C]offee Menu\n[R]eservoir\n[O]ff\n").lower().strip()
-        if choice not in ['c', 'r', 'o']:
-            print("Invalid input. Please, choose a valid option.")
-            return self._get_user_choice()
-        return choice
+        return ask("\n[C]offee Menu\n[R]eservoir\n[F]ill Reservoir\n[O]ff\n",
+                   choice(['c', 'r', 'f', 'o'], "Invalid input. Please, choose a valid option."))
 
     def _get_machine_menus(self, user_choice):
         """Retrieves and displays the menus based on the user's choice"""
         if user_choice == 'c':
             drinks = list(self.coffee_menu.keys())
+            servable = self.forecaster.servable_drinks()
             options_str = "\n".join(f"{index + 1}. {drink.title()}"
+                                    + ("" if drink in servable else " (unavailable)")
                                     for index, drink in enumerate(drinks))
             print(f"Drinks: \n{options_str}\n")
             return drinks
@@ -129,6 +836,11 @@ class CoffeeMachine:
                 for ingredient, detail in self.reservoir.items()
             )
             print(f"Reservoir Status: \n{reservoir_status}\n")
+
+            eta = self.forecaster.next_refill_eta()
+            if eta is not None:
+                ingredient, seconds = eta
+                print(f"Next refill: {ingredient.title()} in about {math.ceil(seconds / 60)} min\n")
             return reservoir_status
 
         else:
@@ -139,88 +851,116 @@ class CoffeeMachine:
         """
         Prompts the user to choose a drink by number, retrieves its cost, returns drink name & cost.
         """
-        try:
-            drink_choice = int(input("Select your drink (number): "))
-            if drink_choice < 1 or drink_choice > len(drinks):
-                print("Invalid choice. Please try again.")
-                return self._get_drink_cost(drinks)
-        except ValueError:
-            print("Invalid input. Please enter a valid number.")
-            return self._get_drink_cost(drinks)
+        drink_choice = ask("Select your drink (number): ",
+                           integer(1, len(drinks),
+                                   message="Invalid input. Please enter a valid number.",
+                                   range_message="Invalid choice. Please try again."))
 
         selected_drink = drinks[drink_choice - 1]
         selected_drink_cost = self.coffee_menu[selected_drink]['cost']
 
-        print(f"The cost of {selected_drink.title()} is €{selected_drink_cost:.2f}.")
+        print(f"The cost of {selected_drink.title()} is {format_euro(selected_drink_cost)}.")
         return selected_drink, selected_drink_cost
 
     def _get_payment(self):
         """
-        Prompts the user for the number of coins inserted for each currency,
-        calculates total payment in euros, and returns that amount.
-        """
-        try:
-            one_cent = int(input("Enter the number of -- 1 cent -- coins: "))
-            two_cents = int(input("Enter the number of -- 2 cent -- coins: "))
-            five_cents = int(input("Enter the number of -- 5 cent -- coins: "))
-            ten_cents = int(input("Enter the number of -- 10 cent -- coins: "))
-            twenty_cents = int(input("Enter the number of -- 20 cent -- coins: "))
-            fifty_cents = int(input("Enter the number of -- 50 cent -- coins: "))
-            one_euro = int(input("Enter the number of -- 1 euro -- coins: "))
-            two_euros = int(input("Enter the number of -- 2 euro -- coins: "))
-        except ValueError:
-            print("Invalid input. Please try again.")
-            return self._get_payment()
-
-        total_inserted = (
-                one_cent * self.euro_currency['one_cent'] +
-                two_cents * self.euro_currency['two_cents'] +
-                five_cents * self.euro_currency['five_cents'] +
-                ten_cents * self.euro_currency['ten_cents'] +
-                twenty_cents * self.euro_currency['twenty_cents'] +
-                fifty_cents * self.euro_currency['fifty_cents'] +
-                one_euro * self.euro_currency['one_euro'] +
-                two_euros * self.euro_currency['two_euro']
+        Prompts the user for the number of coins inserted for each currency
+        and returns the coin counts per denomination.
+        """
+        coin_count = integer(0, MAX_COINS_PER_DENOMINATION, message="Invalid input. Please try again.",
+                             range_message=f"Invalid input. Please enter 0 to {MAX_COINS_PER_DENOMINATION} coins.")
+        return tuple(
+            ask(f"Enter the number of -- {label} -- coins: ", coin_count)
+            for label in ("1 cent", "2 cent", "5 cent", "10 cent",
+                          "20 cent", "50 cent", "1 euro", "2 euro")
         )
-        return total_inserted
 
-    def _get_change(self, selected_drink_cost, total_inserted):
+    @instrumented()
+    def _get_change(self, selected_drink_cost, inserted_coins):
         """
-        Calculates and dispenses change if necessary.
+        Calculates and dispenses change from the coin inventory if necessary.
         If there’s a shortfall, prompts for re-insertion of coins.
+        Returns True once the drink is paid for, False if the machine can't
+        give exact change (the coins are returned).
         """
+        total_inserted = sum(map(mul, inserted_coins, self.changer.values))
         change = total_inserted - selected_drink_cost
-        if change < 0:
-            print(f"Insufficient funds. You are short: €{abs(change):.2f}. Please add more coins.")
-            # If you want to force re-payment:
-            additional_payment = self._get_payment()
-            total_inserted += additional_payment
-            return self._get_change(selected_drink_cost, total_inserted)
+        while change < 0:
+            print(f"Insufficient funds. You are short: {format_euro(-change)}. Please add more coins.")
+            # Force re-payment until the drink is covered
+            additional_coins = self._get_payment()
+            inserted_coins = tuple(map(add, inserted_coins, additional_coins))
+            total_inserted = sum(map(mul, inserted_coins, self.changer.values))
+            change = total_inserted - selected_drink_cost
+
+        if self.changer.pay(inserted_coins, selected_drink_cost) is None:
+            print(f"Sorry, no exact change available. Returning your {format_euro(total_inserted)}.\n")
+            return False
+        print(f"Change: {format_euro(change)}\nThank you! Enjoy your drink!\n")
+        return True
+
+    def _refund(self, amount):
+        """Returns `amount` cents to the customer from the coin inventory."""
+        if self.changer.make_change(amount) is None:
+            print(f"Sorry, unable to refund {format_euro(amount)}. Please contact the operator.\n")
         else:
-            print(f"Change: €{change:.2f}\nThank you! Enjoy your drink!\n")
+            print(f"Refunded: {format_euro(amount)}\n")
 
+    @instrumented()
     def _check_and_update_reservoir(self, drink):
         """
         Checks if there are enough ingredients to serve the drink.
         Deducts the ingredient amounts if sufficient.
         Returns True if served; False otherwise.
         """
-        required_ingredients = self.coffee_menu[drink]["ingredients"]
+        recipe = self._recipe(drink)
+        if recipe is not None and self.reservoir.draw(recipe):
+            print(f"{drink.title()} is served!")
+            return True
 
-        for ingredient, required_amount in required_ingredients.items():
+        # Not served: report the first missing ingredient in recipe order
+        for ingredient, required_amount in self.coffee_menu[drink]["ingredients"].items():
             if ingredient not in self.reservoir:
                 print(f"Error: {ingredient} is not available in the reservoir.")
                 return False
             if self.reservoir[ingredient]["current_level"] < required_amount:
                 print(f"Insufficient {ingredient} to serve {drink.title()}.")
                 return False
+        return False
 
-        # Deduct from reservoir if all checks out
-        for ingredient, required_amount in required_ingredients.items():
-            self.reservoir[ingredient]["current_level"] -= required_amount
+    def _recipe(self, drink):
+        """Returns the compiled recipe vector of a drink, compiling it if the menu changed."""
+        recipe = self.recipes.get(drink)
+        if recipe is None:
+            recipe = self.recipes[drink] = self.reservoir.recipe(self.coffee_menu[drink]["ingredients"])
+        return recipe
 
-        print(f"{drink.title()} is served!")
-        return True
+    def _commit_journal(self):
+        """
+        Records the latest state changes in the transaction journal, if attached,
+        and writes them out, so nothing is lost while the machine waits for input.
+        """
+        if self.journal is not None:
+            self.journal.commit(self)
+            self.journal.flush()
+
+    def _record_order(self, outcome, revenue=0):
+        """Counts an order outcome (and its revenue in cents) in the metrics, if attached."""
+        if self.metrics is not None:
+            self.metrics.record_order(outcome, revenue)
+
+    def _record_rejection(self, drink):
+        """Counts an order refused for lack of ingredients, and which ones ran short, if metrics are attached."""
+        if self.metrics is not None:
+            self.metrics.record_order(REJECTED_INSUFFICIENT_INGREDIENTS)
+            recipe = self._recipe(drink)
+            if recipe is not None:
+                self.metrics.record_shortage(self.reservoir.levels, recipe)
+
+    def _record_stage(self, stage, started):
+        """Records the latency of a run() stage that began at perf_counter() time `started`, if metrics are attached."""
+        if self.metrics is not None:
+            self.metrics.record_stage(stage, started)
 
     def _update_machine_state(self, drink):
         """
@@ -229,34 +969,41 @@ class CoffeeMachine:
         cost = self.coffee_menu[drink]["cost"]
         self.machine_state["money"] += cost
         self.machine_state["drinks_served"][drink] += 1
+        self.forecaster.record_sale(drink)
 
     def _print_report(self):
         """
         Displays the current reservoir levels, total money, and drinks served count.
         """
-        print("\n===== MACHINE REPORT =====\n")
-        print("Reservoir Levels:")
-
-        for ingredient, details in self.reservoir.items():
-            current = details["current_level"]
-            capacity = details["capacity"]
-            unit = details["unit"]
-            percentage = (current / capacity) * 100
-            print(f"> {ingredient.title()}: {current}/{capacity} {unit} ({percentage:.1f}%)")
-
-        print(f"\nTotal Money in Machine: €{self.machine_state['money']:.2f}")
-        print("\nDrinks Served:")
-        for drink, count in self.machine_state["drinks_served"].items():
-            print(f"  {drink.title()}: {count}")
-        print()
+        print_report(self.report_data())
 
 
 # -------------------------
 #    USAGE EXAMPLE
 # -------------------------
+def main(clock=time.monotonic):
+    from coffee_journal import TransactionJournal
+
+    coffee_machine = CoffeeMachine(clock)
+    coffee_machine.attach_journal(TransactionJournal("coffee_machine_data"))
+
+    # Serve live metrics while the machine runs, e.g. COFFEE_METRICS_PORT=9100
+    port = os.environ.get("COFFEE_METRICS_PORT")
+    if port:
+        from coffee_metrics import CoffeeMetrics, start_metrics_server
+
+        metrics = coffee_machine.attach_metrics(CoffeeMetrics(coffee_machine, os.environ.get("COFFEE_MACHINE_ID")))
+        server = start_metrics_server(metrics.registry, port=int(port))
+        print(f"Metrics on http://{server.server_address[0]}:{server.server_address[1]}/metrics\n")
+    try:
+        coffee_machine.run()
+    finally:
+        # Ctrl-C, end of input or an error: keep every transaction so far
+        coffee_machine.journal.close(coffee_machine)
+
+
 if __name__ == "__main__":
-    coffee_machine = CoffeeMachine()
-    coffee_machine.run()
+    main()
 
 
 
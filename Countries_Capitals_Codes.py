@@ -4,47 +4,432 @@ This Python project is an interactive quiz game that tests the player's knowledg
 
 Key Features:
 ✔ Randomly generated questions about country capitals, names, and codes
-✔ Unique questions per quiz session to avoid repetition
+✔ Unique questions per quiz session, drawn from a lazily shuffled question pool
 ✔ User input validation and immediate feedback on correctness
 ✔ Score tracking with a final performance summary
+✔ Full country dataset (data/countries.csv) with indexed lookups and accepted aliases
+✔ Multiple-choice options with plausible distractors (same region, shared code letters, similar names)
+✔ Adaptive mode for named players: spaced repetition of their weakest questions, saved between sessions
 """
+import csv
+import marshal
+import os
 import random
+import re
+import unicodedata
+
+from game_input import ask, text
+from instrumentation import instrumented
+from quiz_mastery import MasteryScheduler, ProgressStore
+
+QUESTION_TYPES = ("capital", "country", "code")
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "countries.csv")
+
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"), "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+
+
+def normalize_answer(answer):
+    """
+    Case-folds an answer and strips accents, punctuation, extra spaces and
+    a leading "the", so "  the netherlands" and "The Netherlands" compare equal.
+    """
+    answer = unicodedata.normalize("NFKD", answer.casefold())
+    answer = "".join(char for char in answer if not unicodedata.combining(char))
+    answer = re.sub(r"[\W_]+", " ", answer).strip()
+    if answer.startswith("the "):
+        answer = answer[4:]
+    return answer
+
+
+def sound_key(name):
+    """
+    Short Soundex-style key (first letter + two consonant classes), so that
+    similar-sounding names share a key: Austria/Australia, Niger/Nigeria.
+    """
+    letters = normalize_answer(name).replace(" ", "")
+    if not letters:
+        return ""
+    key = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0])
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter)
+        if digit is not None and digit != previous:
+            key += digit
+            if len(key) == 3:
+                break
+        if letter not in "hw":
+            previous = digit
+    return key.ljust(3, "0")
+
 
 class Country:
-    def __init__(self, country, capital, code):
+    def __init__(self, country, capital, code, region="", aliases=(), capital_aliases=()):
         self.country = country
         self.capital = capital
         self.code = code
+        self.region = region
+        self.aliases = tuple(aliases)
+        self.capital_aliases = tuple(capital_aliases)
+
 
 class Question:
-    def __init__(self, question_text, answer):
+    def __init__(self, question_text, answer, accepted=None, choices=(), key=None):
         self.question_text = question_text
         self.answer = answer
+        # Normalized answers that count as correct (defaults to the answer itself)
+        self.accepted = accepted if accepted is not None else frozenset([normalize_answer(answer)])
+        # Multiple-choice options (empty for free-text questions)
+        self.choices = tuple(choices)
+        # (country code, question type index) the question is about
+        self.key = key
+
+    def __str__(self):
+        options = "".join(f"\n  {chr(ord('A') + index)}) {choice}"
+                          for index, choice in enumerate(self.choices))
+        return self.question_text + options
+
+    def is_correct(self, user_answer):
+        # A single letter picks one of the multiple-choice options
+        letter = user_answer.strip().upper()
+        if self.choices and len(letter) == 1 and 0 <= ord(letter) - ord("A") < len(self.choices):
+            user_answer = self.choices[ord(letter) - ord("A")]
+        return normalize_answer(user_answer) in self.accepted
+
+
+class CountryDataset:
+    """
+    Read-only collection of countries with hash indexes by name, capital
+    (official capitals and their aliases are indexed separately) and ISO code,
+    plus the accepted (normalized) answers for every question.
+    Built once and shared by every question generator using it.
+    """
+    def __init__(self, countries):
+        self.countries = tuple(countries)
+        self.by_code = {}
+        self.by_name = {}
+        self.by_capital = {}
+        self.by_capital_alias = {}
+
+        for country in self.countries:
+            self.by_code[country.code.upper()] = country
+            for name in (country.country,) + country.aliases:
+                self.by_name.setdefault(normalize_answer(name), country)
+            self.by_capital.setdefault(normalize_answer(country.capital), []).append(country)
+            for capital in country.capital_aliases:
+                self.by_capital_alias.setdefault(normalize_answer(capital), []).append(country)
+
+        # {(question type, country code): normalized answers accepted as correct}
+        self.accepted_answers = {}
+        for country in self.countries:
+            code = country.code
+            self.accepted_answers[("capital", code)] = frozenset(
+                normalize_answer(capital) for capital in (country.capital,) + country.capital_aliases)
+            self.accepted_answers[("code", code)] = frozenset([normalize_answer(code)])
+            # Any country with that capital is a correct answer (e.g. Kingston)
+            self.accepted_answers[("country", code)] = frozenset(
+                normalize_answer(name)
+                for match in self.by_capital[normalize_answer(country.capital)]
+                for name in (match.country,) + match.aliases)
+
+        self._distractors = None
+
+    def __len__(self):
+        return len(self.countries)
+
+    def __iter__(self):
+        return iter(self.countries)
+
+    @property
+    def distractors(self):
+        """Shared DistractorIndex over this dataset, built on first use."""
+        if self._distractors is None:
+            self._distractors = DistractorIndex(self)
+        return self._distractors
+
+    def find(self, name_capital_or_code):
+        """Returns the countries matching a name, alias, capital or ISO code."""
+        key = normalize_answer(name_capital_or_code)
+        matches = list(self.by_capital.get(key, ()))
+        candidates = self.by_capital_alias.get(key, []) + [
+            self.by_name.get(key), self.by_code.get(name_capital_or_code.strip().upper())]
+        for country in candidates:
+            if country is not None and country not in matches:
+                matches.append(country)
+        return matches
+
+
+class DistractorIndex:
+    """
+    Precomputed similarity buckets for picking wrong multiple-choice options:
+    countries by region, ISO codes by letter and country names by sound key.
+    Picking k distractors samples k (plus a few spare) entries from a bucket,
+    so the cost does not depend on the size of the dataset.
+    """
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.by_region = {}
+        self.codes_by_letter = {}
+        self.by_sound = {}
+        for country in dataset.countries:
+            self.by_region.setdefault(country.region, []).append(country)
+            for letter in set(country.code.upper()):
+                self.codes_by_letter.setdefault(letter, []).append(country)
+            self.by_sound.setdefault(sound_key(country.country), []).append(country)
+
+    def distractors(self, country, question_type, k, rng=random):
+        """Returns up to k wrong answers for a question about `country`."""
+        accepted = self.dataset.accepted_answers[(question_type, country.code)]
+        if question_type == "capital":
+            buckets = [self.by_region[country.region]]
+            label = "capital"
+        elif question_type == "code":
+            buckets = [self.codes_by_letter[letter] for letter in country.code.upper()]
+            label = "code"
+        else:
+            buckets = [self.by_sound[sound_key(country.country)], self.by_region[country.region]]
+            label = "country"
+
+        picked = []
+        seen = set(accepted)
+        # Similar buckets first, then the whole dataset as a fallback
+        for bucket in buckets + [self.dataset.countries]:
+            for candidate in rng.sample(bucket, min(len(bucket), k - len(picked) + 3)):
+                value = getattr(candidate, label)
+                normalized = normalize_answer(value)
+                if normalized not in seen:
+                    seen.add(normalized)
+                    picked.append(value)
+                    if len(picked) == k:
+                        return picked
+        return picked
+
+
+def load_countries(path=DEFAULT_DATA_PATH):
+    """
+    Loads a CountryDataset from a CSV file with the columns
+    code, country, capital, region, aliases and capital_aliases ("|"-separated).
+    The parsed rows are cached in __pycache__ next to the file and reused
+    while the file is unchanged.
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cache_path = os.path.join(os.path.dirname(path), "__pycache__", os.path.basename(path) + ".marshal")
+
+    rows = None
+    try:
+        with open(cache_path, "rb") as handle:
+            cached_signature, cached_rows = marshal.load(handle)
+        if cached_signature == signature:
+            rows = cached_rows
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    if rows is None:
+        with open(path, newline="", encoding="utf-8") as handle:
+            rows = [
+                (row["country"], row["capital"], row["code"], row["region"],
+                 tuple(filter(None, row["aliases"].split("|"))),
+                 tuple(filter(None, row["capital_aliases"].split("|"))))
+                for row in csv.DictReader(handle)
+            ]
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "wb") as handle:
+                marshal.dump((signature, rows), handle)
+        except OSError:
+            pass  # Read-only location: parse the CSV every time
+
+    return CountryDataset(Country(*row) for row in rows)
+
+
+class QuestionPoolExhausted(Exception):
+    """Raised when every possible question has already been asked."""
+
+
+class ShuffledPool:
+    """
+    Draws the numbers 0..size-1 in random order, without replacement.
+    A lazy Fisher-Yates shuffle: only the swapped positions are stored,
+    so each draw is O(1) and nothing is allocated up front.
+    """
+    def __init__(self, size, rng=random):
+        self.size = size
+        self.remaining = size
+        self.rng = rng
+        self._swapped = {}
+
+    def __len__(self):
+        return self.remaining
+
+    def draw(self):
+        if self.remaining == 0:
+            raise QuestionPoolExhausted("All questions have been asked")
+        position = self.rng.randrange(self.remaining)
+        last = self.remaining - 1
+        value = self._swapped.get(position, position)
+        # Move the last undrawn value into the drawn slot
+        if position != last:
+            self._swapped[position] = self._swapped.pop(last, last)
+        else:
+            self._swapped.pop(last, None)
+        self.remaining = last
+        return value
+
 
 # Generate unique questions
 class QuestionGenerator:
-    def __init__(self, countries):
-        self.countries = countries
+    """
+    Generates unique questions about the countries.
+    mode="shuffled" (default) walks a lazy random permutation of every
+    (country, question type) pair: O(1) per question, and
+    QuestionPoolExhausted once all of them have been asked.
+    mode="random" is the original rejection sampling on question texts.
+    With num_choices > 1 every question comes with that many options.
+    `rng` makes every random pick; pass a seeded random.Random to make the
+    questions reproducible.
+    """
+    def __init__(self, countries, mode="shuffled", num_choices=0, rng=random):
+        if mode not in ("shuffled", "random"):
+            raise ValueError(f"Unknown question mode: {mode}")
+        # Accepts a CountryDataset or a plain list of Country objects
+        self.dataset = countries if isinstance(countries, CountryDataset) else CountryDataset(countries)
+        self.countries = self.dataset.countries
+        self.mode = mode
+        self.num_choices = num_choices
+        self.rng = rng
+        self.pool = ShuffledPool(len(self.countries) * len(QUESTION_TYPES), rng)
         self.asked_questions = set()
+        # Distinct question texts: countries sharing a capital share one "country" question
+        self._pool_size = 2 * len(self.countries) + len({country.capital for country in self.countries})
+
+    @instrumented()
+    def generate_question(self):
+        if self.mode == "random":
+            return self._random_question()
+
+        while True:
+            # Each pool entry is tried once, so this loop is bounded by the pool size
+            index = self.pool.draw()
+            country = self.countries[index // len(QUESTION_TYPES)]
+            question_type = QUESTION_TYPES[index % len(QUESTION_TYPES)]
+            if question_type == "country" and not self._asks_shared_capital(country):
+                continue
+            return self._build_question(country, question_type)
+
+    def record_answer(self, question, correct):
+        """Called by Quiz after every answer. Plain generators don't track answers."""
+
+    def save(self):
+        """Called by Quiz when it ends. Plain generators have nothing to save."""
+
+    def _random_question(self):
+        if len(self.asked_questions) >= self._pool_size:
+            raise QuestionPoolExhausted("All questions have been asked")
+        while True:
+            country = self.rng.choice(self.countries)
+            question_type = self.rng.choice(QUESTION_TYPES)
+            question = self._build_question(country, question_type)
+            if question.question_text not in self.asked_questions:
+                self.asked_questions.add(question.question_text)
+                return question
+
+    def _asks_shared_capital(self, country):
+        """Only the first country with a given capital asks "Which country has the capital ...?"."""
+        return self.dataset.by_capital[normalize_answer(country.capital)][0] is country
 
+    def _build_question(self, country, question_type):
+        if question_type == "capital":
+            question_text = f"What is the capital of {country.country}?"
+            answer = country.capital
+        elif question_type == "code":
+            question_text = f"What is the country code of {country.country}?"
+            answer = country.code
+        else:
+            question_text = f"Which country has the capital {country.capital}?"
+            answer = country.country
+
+        choices = ()
+        if self.num_choices > 1:
+            choices = self.dataset.distractors.distractors(country, question_type, self.num_choices - 1, self.rng)
+            choices.append(answer)
+            self.rng.shuffle(choices)
+        return Question(question_text, answer,
+                        self.dataset.accepted_answers[(question_type, country.code)], choices,
+                        key=(country.code, QUESTION_TYPES.index(question_type)))
+
+
+class AdaptiveQuestionGenerator(QuestionGenerator):
+    """
+    Spaced-repetition questions for one player.
+    Items the player has answered before are scheduled by a MasteryScheduler
+    (weakest and most overdue first); when none is due, a new item is drawn
+    from the shuffled pool. At least every `new_item_every` questions a new
+    item is asked, so a few hard items can't crowd out the rest.
+    The player's progress is loaded from the ProgressStore on the first
+    question and written back by save().
+    """
+    def __init__(self, countries, player, store=None, num_choices=0, new_item_every=3, rng=random):
+        super().__init__(countries, num_choices=num_choices, rng=rng)
+        self.player = player
+        self.store = store if store is not None else ProgressStore()
+        self.new_item_every = new_item_every
+        self.scheduler = None
+        self._reviews_in_a_row = 0
+
+    @instrumented()
     def generate_question(self):
+        if self.scheduler is None:
+            try:
+                self.scheduler = self.store.load(self.player)
+            except ValueError as error:
+                print(f"Could not read your saved progress ({error}). Starting afresh.\n")
+                self.scheduler = MasteryScheduler()
+
         while True:
-            country = random.choice(self.countries)
-            question_type = random.choice(["capital", "country", "code"])
-
-            if question_type == "capital":
-                question_text = f"What is the capital of {country.country}?"
-                answer = country.capital
-            elif question_type == "code":
-                question_text = f"What is the country code of {country.country}?"
-                answer = country.code
+            key = None
+            if self._reviews_in_a_row < self.new_item_every - 1:
+                key = self.scheduler.pop_due()
+            if key is None:
+                key = self._new_item()
+                self._reviews_in_a_row = 0
             else:
-                question_text = f"Which country has the capital {country.capital}?"
-                answer = country.country
+                self._reviews_in_a_row += 1
+            if key is None:
+                key = self.scheduler.pop_due(force=True)
+            if key is None:
+                raise QuestionPoolExhausted("All questions have been asked")
+            country = self.dataset.by_code.get(key[0])
+            if country is not None:
+                return self._build_question(country, QUESTION_TYPES[key[1]])
+            # The country is no longer in the dataset: forget it
+            del self.scheduler.items[key]
+
+    def record_answer(self, question, correct):
+        if self.scheduler is not None and question.key is not None:
+            self.scheduler.record(question.key, correct)
+
+    def save(self):
+        if self.scheduler is not None:
+            self.store.save(self.player, self.scheduler)
+
+    def _new_item(self):
+        """Draws an item the player has never answered, or None if there are no new items left."""
+        while len(self.pool):
+            index = self.pool.draw()
+            country = self.countries[index // len(QUESTION_TYPES)]
+            key = (country.code, index % len(QUESTION_TYPES))
+            if key in self.scheduler:
+                continue
+            if QUESTION_TYPES[key[1]] == "country" and not self._asks_shared_capital(country):
+                continue
+            return key
+        return None
 
-            if question_text not in self.asked_questions:
-                self.asked_questions.add(question_text)
-                return Question(question_text, answer)
 
 class Quiz:
     def __init__(self, question_generator, num_questions=10):
@@ -52,59 +437,52 @@ class Quiz:
         self.num_questions = num_questions
         self.score = 0
 
+    def check_answer(self, question, user_answer):
+        """Scores an answer to `question`. Returns True if it is correct."""
+        correct = question.is_correct(user_answer)
+        self.question_generator.record_answer(question, correct)
+        if correct:
+            self.score += 1
+        return correct
+
     def start(self):
-        for _ in range(self.num_questions):
-            question = self.question_generator.generate_question()
-            print(question)
-            user_answer = input("Enter your answer: ").strip()
-
-            if user_answer.lower() == question.answer.lower():
-                self.score += 1
-                print("✅ Correct!\n")
-            else:
-                print(f"❌ Incorrect! The correct answer is: {question.answer}\n")
-
-            print(f"Your score is: {self.score}\n")
-        print(f"Quiz finished! Your final score: {self.score}/{self.num_questions}")
-
-
-def main():
-    country_data = [
-        {"country": "The Netherlands", "capital": "Amsterdam", "code": "NL"},
-        {"country": "Greece", "capital": "Athens", "code": "GR"},
-        {"country": "Germany", "capital": "Berlin", "code": "DE"},
-        {"country": "Slovakia", "capital": "Bratislava", "code": "SK"},
-        {"country": "Belgium", "capital": "Brussels", "code": "BE"},
-        {"country": "Romania", "capital": "Bucharest", "code": "RO"},
-        {"country": "Hungary", "capital": "Budapest", "code": "HU"},
-        {"country": "Denmark", "capital": "Copenhagen", "code": "DK"},
-        {"country": "Ireland", "capital": "Dublin", "code": "IE"},
-        {"country": "Finland", "capital": "Helsinki", "code": "FI"},
-        {"country": "Portugal", "capital": "Lisbon", "code": "PT"},
-        {"country": "Slovenia", "capital": "Ljubljana", "code": "SI"},
-        {"country": "Luxembourg", "capital": "Luxembourg", "code": "LU"},
-        {"country": "Spain", "capital": "Madrid", "code": "ES"},
-        {"country": "Cyprus", "capital": "Nicosia", "code": "CY"},
-        {"country": "France", "capital": "Paris", "code": "FR"},
-        {"country": "The Czech Republic", "capital": "Prague", "code": "CZ"},
-        {"country": "Latvia", "capital": "Riga", "code": "LV"},
-        {"country": "Italy", "capital": "Rome", "code": "IT"},
-        {"country": "Bulgaria", "capital": "Sofia", "code": "BG"},
-        {"country": "Sweden", "capital": "Stockholm", "code": "SE"},
-        {"country": "Estonia", "capital": "Tallinn", "code": "EE"},
-        {"country": "Malta", "capital": "Valletta", "code": "MT"},
-        {"country": "Austria", "capital": "Vienna", "code": "AT"},
-        {"country": "Lithuania", "capital": "Vilnius", "code": "LT"},
-        {"country": "Poland", "capital": "Warsaw", "code": "PL"},
-        {"country": "Croatia", "capital": "Zagreb", "code": "HR"},
-        {"country": "The United Kingdom", "capital": "London", "code": "GB"}
-    ]
-
-    # Convert the data to country objects
-    countries = [Country(**data) for data in country_data]
-
-    # Instantiate a QuestionGenerator with the countries list
-    question_generator = QuestionGenerator(countries)
+        asked = 0
+        try:
+            for _ in range(self.num_questions):
+                try:
+                    question = self.question_generator.generate_question()
+                except QuestionPoolExhausted:
+                    print("No more questions left!\n")
+                    break
+                asked += 1
+                print(question)
+                user_answer = ask("Enter your answer (letter or text): " if question.choices
+                                  else "Enter your answer: ", text)
+
+                if self.check_answer(question, user_answer):
+                    print("✅ Correct!\n")
+                else:
+                    print(f"❌ Incorrect! The correct answer is: {question.answer}\n")
+
+                print(f"Your score is: {self.score}\n")
+        finally:
+            # Keep the answers given so far, even if the quiz is interrupted
+            self.question_generator.save()
+        print(f"Quiz finished! Your final score: {self.score}/{asked}")
+
+
+def main(rng=random):
+    # Load the indexed country dataset (all countries, cached after the first run)
+    countries = load_countries()
+
+    # Named players get adaptive questions based on their saved progress
+    player = ask("Enter your name to track your progress (leave blank to play as a guest): ", text)
+
+    # Instantiate a QuestionGenerator with the countries list (4 options per question)
+    if player:
+        question_generator = AdaptiveQuestionGenerator(countries, player, num_choices=4, rng=rng)
+    else:
+        question_generator = QuestionGenerator(countries, num_choices=4, rng=rng)
 
     # Create a Quiz with 10 unique questions
     quiz = Quiz(question_generator, num_questions=10)
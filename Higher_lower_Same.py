@@ -1,59 +1,161 @@
 
 import random
-# Wecome message
+from array import array
+from collections import Counter
 
-print("--------------------")
-print("Welcome to Higher-Lower-Same!")
-print("--------------------")
+from game_input import ask, choice, integer
+from instrumentation import instrumented
+
+# Cards are small ints: card = suit_index * 13 + rank_index (0-51 in a single deck)
+SUITS = ('Hearts', 'Diamonds', 'Clubs', 'Spades')
+RANKS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+RANK_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11)
+
+# Card value for every card code, precomputed once
+CARD_VALUES = array('B', RANK_VALUES * len(SUITS))
+
+# One deck as a compact byte buffer, in build order
+SINGLE_DECK = array('B', range(len(SUITS) * len(RANKS)))
 
 # User chooses number of decks
 def number_of_decks():
-    num_decks = input("How many decks would you like to play with?").strip()
-    try:
-        num_decks = int(num_decks)
-    except ValueError:
-        print("Invalid input. Please enter a number.")
-        return number_of_decks()
-    if num_decks < 1:
-        print("Invalid input. Please enter a number greater than 0.")
-        return number_of_decks()
-    return num_decks
+    return ask("How many decks would you like to play with?",
+               integer(1, message="Invalid input. Please enter a number.",
+                       range_message="Invalid input. Please enter a number greater than 0."))
 
 # Buld Paying Deck with the choosen number of decks & shuffle the deck
-def build_deck(num_decks):
-    suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-    values = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-    deck = []
-    for _ in range(num_decks):
-        for suit in suits:
-            for value in values:
-                deck.append((value, suit))
-    random.shuffle(deck)
+# The deck is an array of card codes (1 byte per card), shuffled in place
+@instrumented()
+def build_deck(num_decks, rng=random):
+    deck = SINGLE_DECK * num_decks
+    rng.shuffle(deck)
     return deck
 
 
+# Human-readable name of a card, e.g. "K of Hearts"
+def card_name(card):
+    suit_index, rank_index = divmod(card, len(RANKS))
+    return f"{RANKS[rank_index]} of {SUITS[suit_index]}"
+
+
+# Cards left in the shoe per card value, updated as cards are dealt.
+# Odds for the current card come from this histogram, never from the deck itself.
+class CardCounter:
+    def __init__(self, deck=()):
+        self.counts = [0] * (max(RANK_VALUES) + 1)
+        for card, count in Counter(deck).items():
+            self.counts[CARD_VALUES[card]] += count
+        self.remaining = len(deck)
+
+    def reset(self, deck):
+        self.__init__(deck)
+
+    @classmethod
+    def from_counts(cls, counts):
+        counter = cls()
+        counter.counts = list(counts)
+        counter.remaining = sum(counts)
+        return counter
+
+    def deal(self, card):
+        self.deal_value(CARD_VALUES[card])
+
+    def deal_value(self, value):
+        self.counts[value] -= 1
+        self.remaining -= 1
+
+    def outcomes(self, card):
+        return count_outcomes(CARD_VALUES[card], self.counts, self.remaining)
+
+    # Chance that the next card is higher, lower or the same as `card`
+    def probabilities(self, card):
+        if not self.remaining:
+            return {'h': 0.0, 'l': 0.0, 's': 0.0}
+        higher, lower, same = self.outcomes(card)
+        return {'h': higher / self.remaining, 'l': lower / self.remaining, 's': same / self.remaining}
+
+
+# Number of cards left that are higher, lower and the same as `value`
+# (the sum only runs over the 10 distinct card values)
+def count_outcomes(value, counts, remaining):
+    lower = sum(counts[:value])
+    same = counts[value]
+    return remaining - lower - same, lower, same
+
+
+# Endless supply of freshly shuffled shoes of `num_decks` decks, built one at a time
+def shuffled_decks(num_decks=1, rng=random):
+    while True:
+        deck = SINGLE_DECK * num_decks
+        rng.shuffle(deck)
+        yield deck
+
+
+# Shoe that never runs out: once only `cut_card` cards are left, the rest is
+# discarded and dealing continues from the next shoe of shuffled_decks().
+# Only one shoe is held in memory, so with num_decks=1 a session of any length
+# costs a single deck.
+class StreamingShoe:
+    def __init__(self, num_decks=1, cut_card=0, rng=random):
+        self.decks = shuffled_decks(num_decks, rng)
+        self.cut_card = cut_card
+        self.deck = next(self.decks)
+        self.shuffles = 1
+        self.counter = None
+
+    # Cards left before the next reshuffle
+    def __len__(self):
+        return len(self.deck) - self.cut_card
+
+    # Keep `counter` in step with the shoe (it is reset on every reshuffle)
+    def track(self, counter):
+        self.counter = counter
+        counter.reset(self.deck)
+        return counter
+
+    def pop(self):
+        card = self.deck.pop()
+        if self.counter is not None:
+            self.counter.deal(card)
+        if len(self.deck) <= self.cut_card:
+            self.deck = next(self.decks)
+            self.shuffles += 1
+            if self.counter is not None:
+                self.counter.reset(self.deck)
+        return card
+
+
+# Shoe that deals with replacement: every card comes from a full deck,
+# so the odds never change and the shoe never runs out
+class InfiniteShoe:
+    def __init__(self, rng=random):
+        self.rng = rng
+
+    def track(self, counter):
+        counter.reset(SINGLE_DECK)
+        return counter
+
+    def pop(self):
+        return self.rng.randrange(len(SINGLE_DECK))
+
+
 # Present Card to the User and get the next card
-def get_card(playing_deck):
-    return playing_deck.pop()
+def get_card(playing_deck, counter=None):
+    card = playing_deck.pop()
+    if counter is not None:
+        counter.deal(card)
+    return card
 
 
 # User chooses Higher, Lower, Same or Quit
 def user_choice():
-    choice = input("Take a guess: [H]igher, [L]ower, [S]ame or [Q]uit?").strip().lower()
-    if choice not in ['h', 'l', 's', 'q']:
-        print("Invalid choice. Please enter: [H]igher, [L]ower, [S]ame or [Q]uit.")
-        return user_choice()
-    return choice
+    return ask("Take a guess: [H]igher, [L]ower, [S]ame or [Q]uit?",
+               choice(['h', 'l', 's', 'q'],
+                      "Invalid choice. Please enter: [H]igher, [L]ower, [S]ame or [Q]uit."))
 
 # get card value
 def get_card_value(card):
-    values = {
-        "2": 2, "3": 3, "4": 4, "5": 5,
-        "6": 6, "7": 7, "8": 8, "9": 9,
-        "10": 10, "J": 10, "Q": 10, "K": 10,
-        "A": 11
-        }
-    return values[card[0]]
+    return CARD_VALUES[card]
 
 
 # Check if the user is correct
@@ -61,10 +163,11 @@ def get_card_value(card):
         # user gets the points of the current card
     # If incorrect:
         # user loses the points of the current card
+@instrumented()
 def check_guess_and_points(card, next_card, choice):
     points = 0
-    card_value = get_card_value(card)
-    next_card_value = get_card_value(next_card)
+    card_value = CARD_VALUES[card]
+    next_card_value = CARD_VALUES[next_card]
     if next_card_value > card_value and choice == 'h':
         points += card_value
     elif next_card_value < card_value and choice == 'l':
@@ -76,27 +179,86 @@ def check_guess_and_points(card, next_card, choice):
     return points
 
 
-def play_game():
-    num_decks = number_of_decks()
-    deck = build_deck(num_decks)
+# User chooses how the cards are dealt
+def shoe_type():
+    return ask("Choose a shoe: [F]ixed (the game ends when it runs out), [S]treaming decks, "
+               "[C]ut card reshuffle or [I]nfinite?",
+               choice(['f', 's', 'c', 'i'],
+                      "Invalid choice. Please enter: [F]ixed, [S]treaming, [C]ut card or [I]nfinite."))
+
+
+# Build the chosen shoe. A fixed shoe is a plain deck array; the others never run out
+def build_shoe(kind, num_decks=1, rng=random):
+    if kind == 's':
+        return StreamingShoe(1, rng=rng)
+    if kind == 'c':
+        # Reshuffle with about a quarter of the shoe left
+        return StreamingShoe(num_decks, cut_card=len(SINGLE_DECK) * num_decks // 4, rng=rng)
+    if kind == 'i':
+        return InfiniteShoe(rng)
+    return build_deck(num_decks, rng)
+
+
+def cards_remaining(deck):
+    if isinstance(deck, InfiniteShoe):
+        return "unlimited"
+    if isinstance(deck, StreamingShoe):
+        return f"{len(deck)} until the next shuffle"
+    return len(deck)
+
+
+# User chooses whether to see the odds for each card
+def hint_mode():
+    answer = ask("Show the odds for each card? [Y]es or [N]o?",
+                 choice(['y', 'n'], "Invalid choice. Please enter: [Y]es or [N]o."))
+    return answer == 'y'
+
+
+def show_odds(counter, card):
+    if not counter.remaining:
+        return
+    odds = counter.probabilities(card)
+    print(f"Odds: Higher {odds['h']:.1%} | Lower {odds['l']:.1%} | Same {odds['s']:.1%}")
+
+
+# `rng` shuffles the cards; pass a seeded random.Random to make a game reproducible
+def play_game(rng=random):
+    kind = shoe_type()
+    num_decks = number_of_decks() if kind in ('f', 'c') else 1
+    deck = build_shoe(kind, num_decks, rng)
+
+    # A plain deck is counted through get_card(); the other shoes update the counter themselves
+    counter = deal_counter = None
+    if hint_mode():
+        if isinstance(deck, array):
+            counter = deal_counter = CardCounter(deck)
+        else:
+            counter = deck.track(CardCounter())
     score = 0
     turn = 1
 
     print(f"-     Turn: {turn}     -")
 
     # Get the first card
-    current_card = get_card(deck)
-    print(f"Current card: {current_card[0]} of {current_card[1]}")
+    current_card = get_card(deck, deal_counter)
+    print(f"Current card: {card_name(current_card)}")
+    if counter is not None:
+        show_odds(counter, current_card)
 
     # Main game loop
     while True:
+        # A fixed shoe can run out
+        if isinstance(deck, array) and not deck:
+            print("The shoe is empty!")
+            break
+
         choice = user_choice()
         if choice == 'q':
             print(f"Game over! Your final score is: {score}")
             break
 
         # Get the next card
-        next_card = get_card(deck)
+        next_card = get_card(deck, deal_counter)
 
         # Check if the user guessed correctly and update the score and the turn
         points = check_guess_and_points(current_card, next_card, choice)
@@ -107,26 +269,36 @@ def play_game():
         if points > 0:
             print("--------------------")
             print(f">>> Correct! <<< \nScore: {score}")
-            print(f"Cards remaining: {len(deck)}")
+            print(f"Cards remaining: {cards_remaining(deck)}")
             print("--------------------")
         else:
             print("--------------------")
             print(f">>> Incorrect! <<< \nScore: {score}")
-            print(f"Cards remaining: {len(deck)}")
+            print(f"Cards remaining: {cards_remaining(deck)}")
             print("--------------------")
         
         # Player keeps the card (previous next_card) and the next_card becomes the current_card
         current_card = next_card
         print(f"-     Turn: {turn}     -")
-        print(f"Current card: {current_card[0]} of {current_card[1]}")
+        print(f"Current card: {card_name(current_card)}")
+        if counter is not None:
+            show_odds(counter, current_card)
     
     # The game is over
     print("Thanks for playing!")
     print(f"Your final score is: {score}")
 
 
+def main(rng=random):
+    # Wecome message
+    print("--------------------")
+    print("Welcome to Higher-Lower-Same!")
+    print("--------------------")
+    play_game(rng)
+
+
 if __name__ == '__main__':
-    play_game()
+    main()
 
 
 
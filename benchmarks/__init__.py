@@ -0,0 +1,6 @@
+"""
+Benchmarks for the games' core loops, written in the asv style: each
+bench_*.py module holds suites whose time_* methods are timed after setup().
+Run them with `python -m benchmarks.run` (see benchmarks/run.py), or point asv
+at this directory.
+"""
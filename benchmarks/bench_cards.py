@@ -0,0 +1,34 @@
+"""Higher-Lower-Same: building large shoes, scoring guesses and counting cards."""
+import random
+
+from Higher_lower_Same import CardCounter, build_deck, check_guess_and_points, get_card
+
+
+class DeckSuite:
+    params = [1, 100, 10000]
+    param_names = ["num_decks"]
+
+    def setup(self, num_decks):
+        self.rng = random.Random(0)
+
+    def time_build_deck(self, num_decks):
+        build_deck(num_decks, self.rng)
+
+    def peakmem_build_deck(self, num_decks):
+        build_deck(num_decks, self.rng)
+
+
+class ScoringSuite:
+    def setup(self):
+        self.deck = build_deck(10000, random.Random(0))
+        self.guesses = ['h', 'l', 's'] * (len(self.deck) // 3 + 1)
+
+    def time_check_guess_and_points(self):
+        sum(map(check_guess_and_points, self.deck, self.deck[1:], self.guesses))
+
+    def time_deal_with_card_counter(self):
+        deck = self.deck[:100000]
+        counter = CardCounter(deck)
+        while deck:
+            card = get_card(deck, counter)
+            counter.probabilities(card)
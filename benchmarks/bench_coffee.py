@@ -0,0 +1,62 @@
+"""Coffee machine: reservoir checks, change making and batch order processing."""
+import os
+from contextlib import redirect_stdout
+
+from Coffee_Machine import CoffeeMachine
+from coffee_fleet import synthetic_orders
+
+
+class ReservoirSuite:
+    def setup(self):
+        self.machine = CoffeeMachine()
+        self.devnull = open(os.devnull, "w")
+
+    def teardown(self):
+        self.devnull.close()
+
+    def time_check_and_update_reservoir(self):
+        # Refill first so every call takes the serving path
+        machine = self.machine
+        with redirect_stdout(self.devnull):
+            for _ in range(100):
+                machine.reservoir.refill()
+                machine._check_and_update_reservoir("latte")
+
+    def time_check_and_update_reservoir_rejected(self):
+        machine = self.machine
+        for level_index in range(len(machine.reservoir.levels)):
+            machine.reservoir.levels[level_index] = 0
+        with redirect_stdout(self.devnull):
+            for _ in range(100):
+                machine._check_and_update_reservoir("cappuccino")
+
+
+class ChangeSuite:
+    def setup(self):
+        self.machine = CoffeeMachine()
+        self.devnull = open(os.devnull, "w")
+        # 2.00 + 1.00 + 0.20 + 0.05 for a 2.50 latte: 0.75 change
+        self.coins = (0, 0, 1, 0, 1, 0, 1, 1)
+        self.inventory = list(self.machine.changer.counts)
+
+    def teardown(self):
+        self.devnull.close()
+
+    def time_get_change(self):
+        machine = self.machine
+        with redirect_stdout(self.devnull):
+            for _ in range(100):
+                machine._get_change(250, self.coins)
+                machine.changer.counts[:] = self.inventory  # Keep the coin inventory steady
+
+
+class BatchSuite:
+    def setup(self):
+        self.machine = CoffeeMachine()
+        self.orders = list(synthetic_orders(self.machine, 10000, seed=0))
+
+    def time_process_orders(self):
+        machine = self.machine
+        for start in range(0, len(self.orders), 50):
+            machine.refill()
+            machine.process_orders(self.orders[start:start + 50])
@@ -0,0 +1,40 @@
+"""Countries quiz: question generation, from a fresh pool down to exhaustion."""
+import random
+
+from Countries_Capitals_Codes import QuestionGenerator, QuestionPoolExhausted, load_countries
+
+
+class QuestionSuite:
+    def setup(self):
+        self.dataset = load_countries()
+        self.dataset.distractors  # Build the shared index outside the timings
+
+    def time_generate_question(self):
+        generator = QuestionGenerator(self.dataset, rng=random.Random(0))
+        for _ in range(100):
+            generator.generate_question()
+
+    def time_generate_question_multiple_choice(self):
+        generator = QuestionGenerator(self.dataset, num_choices=4, rng=random.Random(0))
+        for _ in range(100):
+            generator.generate_question()
+
+    def time_exhaust_pool(self):
+        # Covers the near-exhaustion tail, where most draws used to be rejected
+        generator = QuestionGenerator(self.dataset, rng=random.Random(0))
+        try:
+            while True:
+                generator.generate_question()
+        except QuestionPoolExhausted:
+            pass
+
+    def time_exhaust_pool_random_mode(self):
+        generator = QuestionGenerator(self.dataset, mode="random", rng=random.Random(0))
+        try:
+            while True:
+                generator.generate_question()
+        except QuestionPoolExhausted:
+            pass
+
+    def time_load_countries(self):
+        load_countries()
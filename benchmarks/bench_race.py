@@ -0,0 +1,17 @@
+"""Turtle race: the headless race engine that replaced the per-step turtle loop."""
+import random
+
+from turtle_race import run_race
+
+
+class RaceSuite:
+    def setup(self):
+        self.rng = random.Random(0)
+
+    def time_run_race(self):
+        for _ in range(100):
+            run_race(rng=self.rng)
+
+    def time_run_race_keep_positions(self):
+        for _ in range(100):
+            run_race(rng=self.rng, keep_positions=True)
@@ -0,0 +1,169 @@
+"""
+Minimal runner for the asv-style suites in this directory, so the benchmarks
+work without asv installed. It runs every time_* method (timeit.autorange,
+best and median of several repeats) and peakmem_* method (tracemalloc peak),
+supports asv's params/param_names, and writes the results as JSON so runs
+from different commits can be compared.
+
+Usage (from the repository root):
+python -m benchmarks.run                          # all suites, results in benchmarks/results/<commit>.json
+python -m benchmarks.run -k quiz --repeat 3
+python -m benchmarks.run --compare benchmarks/results/<old commit>.json
+"""
+import argparse
+import importlib
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import instrumentation  # noqa: E402  (needs ROOT on sys.path)
+
+RESULTS_DIRECTORY = os.path.join(ROOT, "benchmarks", "results")
+
+# A result this much slower than the baseline is flagged as a regression
+REGRESSION_THRESHOLD = 1.10
+
+
+def discover(pattern=None):
+    """Yields (name, suite class) for every suite in the bench_* modules."""
+    package = os.path.dirname(os.path.abspath(__file__))
+    for module_info in sorted(pkgutil.iter_modules([package]), key=lambda info: info.name):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"benchmarks.{module_info.name}")
+        for attribute, suite in sorted(vars(module).items()):
+            if isinstance(suite, type) and suite.__module__ == module.__name__:
+                name = f"{module_info.name}.{attribute}"
+                if pattern is None or pattern in name:
+                    yield name, suite
+
+
+def _parameter_sets(suite):
+    params = getattr(suite, "params", None)
+    if params is None:
+        return [()]
+    if not isinstance(params[0], (list, tuple)):
+        params = [params]  # A single parameter
+    return list(itertools.product(*params))
+
+
+def _time(method, args, repeat):
+    timer = timeit.Timer(lambda: method(*args))
+    number, _ = timer.autorange()
+    samples = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {"best": min(samples), "median": statistics.median(samples), "number": number, "repeat": repeat}
+
+
+def _peakmem(method, args):
+    tracemalloc.start()
+    try:
+        method(*args)
+        return {"peak_bytes": tracemalloc.get_traced_memory()[1]}
+    finally:
+        tracemalloc.stop()
+
+
+def run(pattern=None, repeat=5):
+    """Runs the matching benchmarks and returns {benchmark name: result}."""
+    results = {}
+    for suite_name, suite in discover(pattern):
+        methods = [name for name in dir(suite) if name.startswith(("time_", "peakmem_"))]
+        for args in _parameter_sets(suite):
+            instance = suite()
+            if hasattr(instance, "setup"):
+                instance.setup(*args)
+            try:
+                for method_name in methods:
+                    name = f"{suite_name}.{method_name}" + (f"({', '.join(map(repr, args))})" if args else "")
+                    method = getattr(instance, method_name)
+                    with instrumentation.profiled(name):
+                        if method_name.startswith("time_"):
+                            results[name] = _time(method, args, repeat)
+                        else:
+                            results[name] = _peakmem(method, args)
+                    print(f"{name:<75}{_format(results[name])}", flush=True)
+            finally:
+                if hasattr(instance, "teardown"):
+                    instance.teardown(*args)
+    return results
+
+
+def _format(result):
+    if "peak_bytes" in result:
+        return f"{result['peak_bytes'] / 1024:>12,.1f} KiB"
+    seconds = result["best"]
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1 or unit == "us":
+            return f"{seconds * scale:>12,.3f} {unit}"
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline):
+    """Prints the change against a baseline result file. Returns the number of regressions."""
+    regressions = 0
+    print(f"\n{'benchmark':<75}{'ratio':>8}")
+    for name, result in results.items():
+        old = baseline["results"].get(name)
+        key = "peak_bytes" if "peak_bytes" in result else "best"
+        if old is None or key not in old or not old[key]:
+            continue
+        ratio = result[key] / old[key]
+        flag = "  REGRESSION" if ratio > REGRESSION_THRESHOLD else ""
+        regressions += bool(flag)
+        print(f"{name:<75}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the CLI_Games benchmarks.")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats per benchmark")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="result file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    commit = _commit()
+    results = run(args.pattern, args.repeat)
+    document = {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+        "instrumentation": instrumentation.stats(),
+    }
+
+    output = args.output or os.path.join(RESULTS_DIRECTORY, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(document, handle, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(results, json.load(handle))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Description:
+One entry point for the whole CLI_Games collection. Shows a menu of the
+games in the GAMES registry and imports a game's module only when the player
+picks it, so starting the launcher costs almost nothing (turtle/tkinter, the
+country dataset and the coffee machine are loaded only when their game is
+played).
+
+Key Features:
+✔ Registry of games: menu key, title, module and entry point
+✔ Lazy imports through importlib; nothing runs until a game is chosen
+✔ Returns to the menu after each game
+
+Usage:
+python cli_games.py          # choose from the menu
+python cli_games.py quiz     # start one game directly
+
+Check the startup cost with: python -X importtime cli_games.py --list
+"""
+import sys
+from importlib import import_module
+
+from game_input import ask, choice
+from instrumentation import ENABLED as INSTRUMENTED, profiled, report
+
+
+class Game:
+    """
+    A registered game: `entry` is the function in `module` that plays it.
+    `console_entry` plays it without any window (used when recording and
+    replaying sessions), and `options` names the keyword arguments the entry
+    points accept for reproducible runs ("rng" and/or "clock").
+    """
+    def __init__(self, key, title, module, entry="main", console_entry=None, options=()):
+        self.key = key
+        self.title = title
+        self.module = module
+        self.entry = entry
+        self.console_entry = console_entry or entry
+        self.options = options
+
+    def play(self, console=False, **options):
+        entry = self.console_entry if console else self.entry
+        with profiled(self.key):
+            getattr(import_module(self.module), entry)(**options)
+
+
+GAMES = {game.key: game for game in (
+    Game("coffee", "Coffee Machine", "Coffee_Machine", options=("clock",)),
+    Game("quiz", "Countries, Capitals & Codes quiz", "Countries_Capitals_Codes", options=("rng",)),
+    Game("cards", "Higher-Lower-Same", "Higher_lower_Same", options=("rng",)),
+    Game("race", "Turtle Race (opens a window)", "turtle_race", entry="play",
+         console_entry="play_console", options=("rng",)),
+)}
+
+
+def menu():
+    """Shows the games until the player quits."""
+    keys = list(GAMES)
+    while True:
+        print("\n===== CLI GAMES =====")
+        for number, key in enumerate(keys, start=1):
+            print(f"[{number}] {GAMES[key].title}")
+        print("[Q] Quit")
+
+        options = [str(number) for number in range(1, len(keys) + 1)] + keys + ["q"]
+        selected = ask("Which game would you like to play?",
+                       choice(options, "Invalid choice. Please enter a game number or Q."))
+        if selected == "q":
+            print("Goodbye!")
+            return
+        game = GAMES[keys[int(selected) - 1]] if selected.isdigit() else GAMES[selected]
+        game.play()
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        menu()
+    elif args[0] == "--list":
+        for game in GAMES.values():
+            print(f"{game.key:<8}{game.title}")
+    elif args[0] in GAMES:
+        GAMES[args[0]].play()
+    else:
+        print(f"Unknown game '{args[0]}'. Choose one of: {', '.join(GAMES)}")
+        return 1
+    if INSTRUMENTED:
+        report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
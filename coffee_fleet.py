@@ -0,0 +1,226 @@
+"""
+Description:
+Fleet simulator for the Coffee Machine. Runs many independent CoffeeMachine
+instances across a process pool, feeds each one a synthetic (seeded) or
+recorded order stream through CoffeeMachine.process_orders(), and merges the
+per-machine report data into a single fleet report.
+
+Key Features:
+✔ Machines sharded across a concurrent.futures.ProcessPoolExecutor, one shard per worker
+✔ Reproducible synthetic order streams, or recorded orders loaded from a CSV file
+✔ Periodic operator refills of the reservoir between order batches
+✔ Aggregated machine report plus throughput (orders/sec) per worker
+
+Usage:
+python coffee_fleet.py --machines 500 --orders 20000 --workers 8
+python coffee_fleet.py --orders-file orders.csv
+"""
+import argparse
+import csv
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Coffee_Machine import CoffeeMachine, OUTCOME_LABELS, format_euro, print_report
+
+
+# -------------------------
+#    ORDER STREAMS
+# -------------------------
+
+def payment_options(machine):
+    """
+    Builds typical coin payments for each drink on the machine's menu:
+    exact payments, overpayments that need change, and one short payment.
+    """
+    values = list(machine.euro_currency.values())
+
+    def coins_for(amount):
+        # Greedy breakdown, largest coins first
+        coins = [0] * len(values)
+        for index in range(len(values) - 1, -1, -1):
+            coins[index], amount = divmod(amount, values[index])
+        return tuple(coins)
+
+    options = {}
+    for drink, details in machine.coffee_menu.items():
+        cost = details["cost"]
+        paid = [cost, cost, cost + 50, cost + 100 - cost % 100, cost + 200, cost - 50]
+        options[drink] = [coins_for(amount) for amount in paid if amount > 0]
+    return options
+
+
+def synthetic_orders(machine, count, seed):
+    """Yields `count` reproducible random (drink, coins) orders for `machine`."""
+    rng = random.Random(seed)
+    options = payment_options(machine)
+    drinks = list(options)
+    weights = [5, 3, 2][:len(drinks)] + [1] * max(0, len(drinks) - 3)
+    for drink in rng.choices(drinks, weights=weights, k=count):
+        yield drink, rng.choice(options[drink])
+
+
+def load_recorded_orders(path):
+    """
+    Loads recorded orders from a CSV file with the columns
+    machine, drink and one column per coin denomination (1 cent ... 2 euro).
+    Returns {machine_id: [(drink, coins), ...]}.
+    """
+    orders = {}
+    with open(path, newline="") as handle:
+        for row in csv.reader(handle):
+            if not row or row[0] == "machine":
+                continue  # Skip blank lines and the header
+            machine_id, drink, *coins = row
+            orders.setdefault(int(machine_id), []).append((drink, tuple(map(int, coins))))
+    return orders
+
+
+# -------------------------
+#    SIMULATION
+# -------------------------
+
+def _run_shard(machine_ids, orders_per_machine, seed, refill_every, recorded):
+    """
+    Worker entry point: simulates the given machines one after the other.
+    Returns the machine reports, the outcome counts and the worker timing.
+    """
+    started = time.perf_counter()
+    reports = []
+    outcomes = dict.fromkeys(OUTCOME_LABELS.values(), 0)
+    processed = 0
+
+    for machine_id in machine_ids:
+        machine = CoffeeMachine()
+        if recorded is not None:
+            orders = recorded.get(machine_id, [])
+        else:
+            orders = list(synthetic_orders(machine, orders_per_machine, seed + machine_id))
+
+        # The operator refills the reservoir every `refill_every` orders
+        step = refill_every or len(orders) or 1
+        for start in range(0, len(orders), step):
+            if start:
+                machine.refill()
+            result = machine.process_orders(orders[start:start + step])
+            for label, count in result.summary().items():
+                outcomes[label] += count
+        processed += len(orders)
+        reports.append(machine.report_data())
+
+    return {
+        "pid": os.getpid(),
+        "machines": len(machine_ids),
+        "orders": processed,
+        "seconds": time.perf_counter() - started,
+        "outcomes": outcomes,
+        "reports": reports,
+    }
+
+
+def merge_reports(reports):
+    """Sums machine reports (see CoffeeMachine.report_data()) into one fleet report."""
+    merged = {"reservoir": {}, "money": 0, "coins": {}, "drinks_served": {}}
+    for report in reports:
+        for ingredient, detail in report["reservoir"].items():
+            total = merged["reservoir"].setdefault(
+                ingredient, {"current_level": 0, "capacity": 0, "unit": detail["unit"]})
+            total["current_level"] += detail["current_level"]
+            total["capacity"] += detail["capacity"]
+        merged["money"] += report["money"]
+        for name, count in report["coins"].items():
+            merged["coins"][name] = merged["coins"].get(name, 0) + count
+        for drink, count in report["drinks_served"].items():
+            merged["drinks_served"][drink] = merged["drinks_served"].get(drink, 0) + count
+    return merged
+
+
+def simulate_fleet(num_machines, orders_per_machine=10000, workers=None, seed=0,
+                   refill_every=50, recorded=None):
+    """
+    Simulates a fleet of `num_machines` machines across `workers` processes.
+    With `recorded` ({machine_id: orders}) the recorded streams are replayed
+    instead of synthetic ones. Returns the aggregated fleet statistics.
+    """
+    if recorded is not None:
+        machine_ids = sorted(recorded)
+    else:
+        machine_ids = list(range(num_machines))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(machine_ids) or 1))
+
+    # One shard per worker, so each worker's throughput can be reported
+    shards = [machine_ids[index::workers] for index in range(workers)]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_run_shard, shard, orders_per_machine, seed, refill_every,
+                            None if recorded is None else {m: recorded[m] for m in shard})
+            for shard in shards
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    outcomes = dict.fromkeys(OUTCOME_LABELS.values(), 0)
+    for result in results:
+        for label, count in result["outcomes"].items():
+            outcomes[label] += count
+    total_orders = sum(result["orders"] for result in results)
+
+    return {
+        "machines": len(machine_ids),
+        "orders": total_orders,
+        "outcomes": outcomes,
+        "report": merge_reports(report for result in results for report in result["reports"]),
+        "workers": [
+            {
+                "pid": result["pid"],
+                "machines": result["machines"],
+                "orders": result["orders"],
+                "seconds": result["seconds"],
+                "orders_per_sec": result["orders"] / result["seconds"] if result["seconds"] else 0.0,
+            }
+            for result in results
+        ],
+        "seconds": elapsed,
+        "orders_per_sec": total_orders / elapsed if elapsed else 0.0,
+    }
+
+
+def print_fleet_report(fleet):
+    """Displays the aggregated machine report and the fleet throughput."""
+    print(f"\n===== FLEET: {fleet['machines']} machines, {fleet['orders']} orders =====")
+    print_report(fleet["report"])
+
+    print("Order Outcomes:")
+    for label, count in fleet["outcomes"].items():
+        print(f"  {label.replace('_', ' ').title()}: {count}")
+
+    print("\nThroughput:")
+    for worker in fleet["workers"]:
+        print(f"  Worker {worker['pid']}: {worker['machines']} machines, "
+              f"{worker['orders']} orders in {worker['seconds']:.2f}s "
+              f"({worker['orders_per_sec']:,.0f} orders/sec)")
+    print(f"  Fleet: {fleet['orders_per_sec']:,.0f} orders/sec over {fleet['seconds']:.2f}s")
+    print(f"  Average revenue per machine: "
+          f"{format_euro(fleet['report']['money'] // max(1, fleet['machines']))}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a fleet of coffee machines.")
+    parser.add_argument("--machines", type=int, default=100, help="number of machines")
+    parser.add_argument("--orders", type=int, default=10000, help="synthetic orders per machine")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic order streams")
+    parser.add_argument("--refill-every", type=int, default=50, help="orders between reservoir refills")
+    parser.add_argument("--orders-file", help="CSV of recorded orders to replay instead")
+    args = parser.parse_args()
+
+    recorded = load_recorded_orders(args.orders_file) if args.orders_file else None
+    fleet = simulate_fleet(args.machines, args.orders, args.workers, args.seed,
+                           args.refill_every, recorded)
+    print_fleet_report(fleet)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Description:
+Persistent state for the Coffee Machine: an append-only binary transaction
+log with periodic compact snapshots.
+
+Each committed transaction is stored as the difference between the machine
+state before and after it (reservoir levels, coins held, money and drinks
+served), tagged with a sequence number and a CRC. Every `snapshot_every`
+records the full state is written to a snapshot and the log is emptied, so
+on startup the machine loads the snapshot and replays a short log tail no
+matter how many transactions it has served. Records are buffered in memory
+until flush(); CoffeeMachine flushes after every transaction (or batch of
+orders), before it waits for the next input.
+
+Key Features:
+✔ Append-only log with sequence numbers and per-record CRC32
+✔ Atomic snapshots (written to a temporary file, then renamed)
+✔ Restore = latest snapshot + log tail; a torn final record is ignored
+✔ Buffered writes with an explicit flush()/close()
+"""
+import json
+import os
+import struct
+import zlib
+
+LOG_MAGIC = b"CMLOG1\n"
+SNAPSHOT_MAGIC = b"CMSNAP1\n"
+
+# Sequence number and CRC32 of the payload, in front of every log record
+RECORD_HEADER = struct.Struct("<QI")
+LENGTH = struct.Struct("<I")
+
+
+def machine_layout(machine):
+    """Names of every value in the journaled state, in state-vector order."""
+    return {
+        "ingredients": list(machine.reservoir),
+        "coins": list(machine.changer.names),
+        "drinks": list(machine.machine_state["drinks_served"]),
+    }
+
+
+def machine_state_vector(machine):
+    """Flattens the journaled machine state into a tuple of integers."""
+    return (
+        tuple(machine.reservoir.levels)
+        + tuple(machine.changer.counts)
+        + (machine.machine_state["money"],)
+        + tuple(machine.machine_state["drinks_served"].values())
+    )
+
+
+def apply_state_vector(machine, values):
+    """Loads a state vector produced by machine_state_vector() into the machine."""
+    num_ingredients = len(machine.reservoir)
+    num_coins = len(machine.changer.counts)
+    levels = values[:num_ingredients]
+    coins = values[num_ingredients:num_ingredients + num_coins]
+    money = values[num_ingredients + num_coins]
+    drinks = values[num_ingredients + num_coins + 1:]
+
+    for position, level in enumerate(levels):
+        machine.reservoir.levels[position] = level
+    machine.changer.counts[:] = coins
+    machine.machine_state["money"] = money
+    for drink, count in zip(list(machine.machine_state["drinks_served"]), drinks):
+        machine.machine_state["drinks_served"][drink] = count
+
+
+class TransactionJournal:
+    """
+    Append-only transaction log plus snapshot for one machine, stored in `directory`.
+    Call restore() once at startup, commit() after each transaction and close() on shutdown.
+    """
+    def __init__(self, directory, snapshot_every=1000, flush_every=64, fsync=False):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.flush_every = flush_every
+        self.fsync = fsync
+        self.log_path = os.path.join(directory, "transactions.log")
+        self.snapshot_path = os.path.join(directory, "snapshot.bin")
+
+        self.sequence = 0          # Sequence number of the last committed transaction
+        self._since_snapshot = 0   # Records in the log since the last snapshot
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._layout = None
+        self._format = None
+        self._last_state = None
+        self._log = None
+        self._log_end = None       # Offset just past the last valid log record
+
+    # -------------------------
+    #    PUBLIC API
+    # -------------------------
+
+    def restore(self, machine):
+        """
+        Loads the latest snapshot and replays the log tail into the machine.
+        Returns the number of log records replayed.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._layout = machine_layout(machine)
+        self._format = struct.Struct(f"<{len(machine_state_vector(machine))}q")
+
+        state = machine_state_vector(machine)
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            self.sequence, state = snapshot
+
+        replayed = 0
+        for sequence, delta in self._read_log():
+            if sequence <= self.sequence:
+                continue  # Already part of the snapshot
+            state = tuple(map(int.__add__, state, delta))
+            self.sequence = sequence
+            replayed += 1
+
+        apply_state_vector(machine, state)
+        if hasattr(machine, "forecaster"):
+            machine.forecaster.reset()
+        self._last_state = state
+        self._since_snapshot = replayed
+        self._open_log(truncate=False)
+        return replayed
+
+    def commit(self, machine):
+        """Appends the state change since the last commit, if there is one."""
+        state = machine_state_vector(machine)
+        if state == self._last_state:
+            return False
+
+        delta = tuple(map(int.__sub__, state, self._last_state))
+        payload = self._format.pack(*delta)
+        self.sequence += 1
+        self._buffer += RECORD_HEADER.pack(self.sequence, zlib.crc32(payload))
+        self._buffer += payload
+        self._buffered += 1
+        self._since_snapshot += 1
+        self._last_state = state
+
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot(machine)
+        elif self._buffered >= self.flush_every:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Writes the buffered records to the log file."""
+        if self._buffer:
+            self._log.write(self._buffer)
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            self._buffer.clear()
+            self._buffered = 0
+
+    def snapshot(self, machine):
+        """Writes the full machine state as a snapshot and empties the log."""
+        self.flush()
+        state = machine_state_vector(machine)
+
+        temporary_path = self.snapshot_path + ".tmp"
+        with open(temporary_path, "wb") as handle:
+            handle.write(SNAPSHOT_MAGIC + self._layout_header())
+            handle.write(struct.pack("<Q", self.sequence))
+            handle.write(self._format.pack(*state))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary_path, self.snapshot_path)
+
+        # Records up to self.sequence now live in the snapshot
+        self._last_state = state
+        self._since_snapshot = 0
+        self._open_log(truncate=True)
+
+    def close(self, machine=None):
+        """Flushes the log (and snapshots the machine, if given) and closes the file."""
+        if self._log is None:
+            return
+        if machine is not None:
+            self.commit(machine)
+            self.snapshot(machine)
+        else:
+            self.flush()
+        self._log.close()
+        self._log = None
+
+    # -------------------------
+    #    PRIVATE METHODS
+    # -------------------------
+
+    def _layout_header(self):
+        layout = json.dumps(self._layout).encode()
+        return LENGTH.pack(len(layout)) + layout
+
+    def _open_log(self, truncate):
+        """Opens the log for appending, starting a fresh file when asked to (or when there is no valid log)."""
+        if self._log is not None:
+            self._log.close()
+        if truncate or self._log_end is None:
+            # Like the snapshot, a fresh log replaces the old one in a single rename
+            temporary_path = self.log_path + ".tmp"
+            with open(temporary_path, "wb") as handle:
+                handle.write(LOG_MAGIC + self._layout_header())
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary_path, self.log_path)
+        elif os.path.getsize(self.log_path) > self._log_end:
+            # Drop a torn or corrupt tail so new records follow the last good one
+            os.truncate(self.log_path, self._log_end)
+        self._log_end = None
+        self._log = open(self.log_path, "ab")
+
+    def _check_layout(self, handle, magic, path):
+        """Checks a file header against the machine layout. Returns False if the file ends inside it."""
+        found = handle.read(len(magic))
+        if len(found) < len(magic) and magic.startswith(found):
+            return False
+        if found != magic:
+            raise ValueError(f"{path} is not a coffee machine journal file")
+        length = handle.read(LENGTH.size)
+        if len(length) < LENGTH.size:
+            return False
+        (length,) = LENGTH.unpack(length)
+        layout = handle.read(length)
+        if len(layout) < length:
+            return False
+        if json.loads(layout) != self._layout:
+            raise ValueError(f"{path} was written for a different machine layout")
+        return True
+
+    def _read_snapshot(self):
+        """Returns (sequence, state) from the snapshot, or None if there is none."""
+        if not os.path.exists(self.snapshot_path):
+            return None
+        data_size = 8 + self._format.size
+        with open(self.snapshot_path, "rb") as handle:
+            complete = self._check_layout(handle, SNAPSHOT_MAGIC, self.snapshot_path)
+            data = handle.read(data_size)
+        if not complete or len(data) < data_size:
+            raise ValueError(f"{self.snapshot_path} is truncated")
+        (sequence,) = struct.unpack_from("<Q", data)
+        return sequence, self._format.unpack_from(data, 8)
+
+    def _read_log(self):
+        """
+        Yields (sequence, delta) for every complete, valid record in the log.
+        A log cut short inside its header counts as empty (and is rewritten on open).
+        """
+        self._log_end = None
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "rb") as handle:
+            if not self._check_layout(handle, LOG_MAGIC, self.log_path):
+                return
+            record_size = RECORD_HEADER.size + self._format.size
+            self._log_end = handle.tell()
+            while True:
+                record = handle.read(record_size)
+                if len(record) < record_size:
+                    return  # End of log (or a torn final write)
+                sequence, crc = RECORD_HEADER.unpack_from(record)
+                payload = record[RECORD_HEADER.size:]
+                if zlib.crc32(payload) != crc:
+                    return  # Corrupt tail: stop at the last good record
+                self._log_end = handle.tell()
+                yield sequence, self._format.unpack(payload)
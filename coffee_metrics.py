@@ -0,0 +1,247 @@
+"""
+Description:
+Live metrics for the Coffee Machine. A small registry of counters, gauges and
+histograms is updated in place while the machine runs, and a local HTTP
+server thread serves it as Prometheus text (/metrics) or JSON (/metrics.json),
+so a fleet of machines can be scraped without stopping them or parsing their
+console output.
+
+Counters and histograms are created once, with all their label values, and
+keep their numbers in preallocated arrays: an update is an index lookup and
+an in-place add, with no new metric objects or dict entries on the hot path.
+Gauges such as reservoir levels and money are read from the machine only
+when scraped.
+
+Key Features:
+✔ Orders by outcome, rejections per missing ingredient and revenue (counters)
+✔ Reservoir levels, capacities, money and drinks served (gauges, read at scrape time)
+✔ Latency histograms for every stage of CoffeeMachine.run()
+✔ Prometheus text exposition format and JSON over http.server in a daemon thread
+
+Usage:
+COFFEE_METRICS_PORT=9100 python Coffee_Machine.py
+curl localhost:9100/metrics
+"""
+import json
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Coffee_Machine import OUTCOME_LABELS, STAGE_LABELS
+
+# Histogram bucket upper bounds, in seconds (the input stages include the customer's think time)
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    """Escapes a label value as the Prometheus text format requires."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class CounterFamily:
+    """Monotonic counters, one per value of a single label (or one unlabelled counter)."""
+    kind = "counter"
+
+    def __init__(self, name, help_text, label=None, label_values=("",)):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.label_values = tuple(label_values)
+        self.index = {value: position for position, value in enumerate(self.label_values)}
+        self.values = array('q', [0]) * len(self.label_values)
+
+    def inc(self, position=0, amount=1):
+        """Adds `amount` to the counter at `position` (see `index` for a label value's position)."""
+        self.values[position] += amount
+
+    def samples(self):
+        for value, count in zip(self.label_values, self.values):
+            yield self.name, {self.label: value} if self.label else {}, count
+
+
+class GaugeFamily:
+    """Gauges whose values are read from `read()` ({label value: number}) at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, read, label=None):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.label = label
+
+    def samples(self):
+        for value, number in self.read().items():
+            yield self.name, {self.label: value} if self.label else {}, number
+
+
+class HistogramFamily:
+    """
+    Histograms with fixed buckets, one per value of a single label.
+    Bucket counts are kept per bucket (not cumulative) and summed on export.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label, label_values, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.label_values = tuple(label_values)
+        self.index = {value: position for position, value in enumerate(self.label_values)}
+        self.buckets = tuple(buckets)
+        width = len(self.buckets) + 1  # The last slot is the +Inf bucket
+        self.width = width
+        self.counts = array('q', [0]) * (width * len(self.label_values))
+        self.sums = array('d', [0.0]) * len(self.label_values)
+
+    def observe(self, position, value):
+        self.counts[position * self.width + bisect_left(self.buckets, value)] += 1
+        self.sums[position] += value
+
+    def samples(self):
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        for position, value in enumerate(self.label_values):
+            cumulative = 0
+            for slot, bound in enumerate(bounds):
+                cumulative += self.counts[position * self.width + slot]
+                yield f"{self.name}_bucket", {self.label: value, "le": bound}, cumulative
+            yield f"{self.name}_sum", {self.label: value}, self.sums[position]
+            yield f"{self.name}_count", {self.label: value}, cumulative
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them; `const_labels` are added to every sample."""
+    def __init__(self, const_labels=None):
+        self.const_labels = dict(const_labels or {})
+        self.families = []
+
+    def register(self, family):
+        self.families.append(family)
+        return family
+
+    def render_prometheus(self):
+        lines = []
+        for family in self.families:
+            lines.append(f"# HELP {family.name} {family.help_text}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples():
+                lines.append(f"{name}{_label_text({**self.const_labels, **labels})} {value}")
+        return "\n".join(lines) + "\n"
+
+    def as_dict(self):
+        """Every family as {"type", "help", "samples": [{"name", "labels", "value"}]}."""
+        return {
+            "labels": self.const_labels,
+            "metrics": {
+                family.name: {
+                    "type": family.kind,
+                    "help": family.help_text,
+                    "samples": [{"name": name, "labels": labels, "value": value}
+                                for name, labels, value in family.samples()],
+                }
+                for family in self.families
+            },
+        }
+
+
+class CoffeeMetrics:
+    """
+    The metrics of one CoffeeMachine. Attach it with machine.attach_metrics();
+    the machine then reports orders, rejections, revenue and stage latencies.
+    """
+    def __init__(self, machine, machine_id=None):
+        self.machine = machine
+        self.started = time.monotonic()
+        self.registry = MetricsRegistry({"machine": machine_id} if machine_id is not None else None)
+        register = self.registry.register
+
+        self.orders = register(CounterFamily(
+            "coffee_orders_total", "Orders handled, by outcome.", "outcome", OUTCOME_LABELS.values()))
+        self.rejections = register(CounterFamily(
+            "coffee_ingredient_rejections_total", "Orders rejected for lack of an ingredient, by ingredient.",
+            "ingredient", machine.reservoir))
+        self.revenue = register(CounterFamily(
+            "coffee_revenue_cents_total", "Revenue from served drinks, in cents."))
+        self.stages = register(HistogramFamily(
+            "coffee_stage_seconds", "Latency of each CoffeeMachine.run() stage.", "stage", STAGE_LABELS.values()))
+        register(GaugeFamily(
+            "coffee_reservoir_level", "Current reservoir level, in each ingredient's unit.",
+            lambda: dict(zip(machine.reservoir, machine.reservoir.levels)), "ingredient"))
+        register(GaugeFamily(
+            "coffee_reservoir_capacity", "Reservoir capacity, in each ingredient's unit.",
+            lambda: dict(zip(machine.reservoir, machine.reservoir.capacities)), "ingredient"))
+        register(GaugeFamily(
+            "coffee_money_cents", "Money held by the machine, in cents.",
+            lambda: {"": machine.machine_state["money"]}))
+        register(GaugeFamily(
+            "coffee_drinks_served", "Drinks served since the machine was installed, by drink.",
+            lambda: dict(machine.machine_state["drinks_served"]), "drink"))
+        register(GaugeFamily(
+            "coffee_orders_per_second", "Average orders handled per second since the metrics started.",
+            lambda: {"": sum(self.orders.values) / max(time.monotonic() - self.started, 1e-9)}))
+
+    # Hot-path updates, called by CoffeeMachine
+
+    def record_order(self, outcome, revenue=0):
+        self.orders.values[outcome] += 1
+        if revenue:
+            self.revenue.values[0] += revenue
+
+    def record_shortage(self, levels, recipe):
+        """Counts a rejection against every ingredient whose level is below the recipe's amount."""
+        rejections = self.rejections.values
+        for position, (level, required) in enumerate(zip(levels, recipe)):
+            if level < required:
+                rejections[position] += 1
+
+    def record_batch(self, outcomes, revenue):
+        """Adds a process_orders() batch: `outcomes` is its array of outcome codes."""
+        for code in OUTCOME_LABELS:
+            self.orders.values[code] += outcomes.count(code)
+        self.revenue.values[0] += revenue
+
+    def record_stage(self, stage, started):
+        """Observes the time since `started` (a time.perf_counter() value) for stage number `stage`."""
+        self.stages.observe(stage, time.perf_counter() - started)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None  # Set on the subclass created by start_metrics_server()
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = self.registry.render_prometheus().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body = json.dumps(self.registry.as_dict()).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404, "Try /metrics or /metrics.json")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of the machine's console
+
+
+def start_metrics_server(registry, host="127.0.0.1", port=9100):
+    """
+    Serves `registry` over HTTP from a daemon thread and returns the server
+    (call server.shutdown() to stop it; server.server_address has the port).
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="coffee-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,138 @@
+"""
+Description:
+Input handling shared by the CLI games.
+
+Prompts are retried in a loop instead of by recursion, so a stream with any
+number of bad entries costs constant stack and memory. Each prompt takes a
+parser that either returns the parsed value or raises InvalidInput with the
+message to show the player. The same parsers work with ask_async(), which
+reads from an asyncio stream (or stdin through a worker thread); the quiz
+server uses it to validate every connection's answers on one event loop.
+
+Key Features:
+✔ Iterative retry loop with an optional bound on the number of attempts
+✔ Reusable parsers for menu choices, integers and free text
+✔ asyncio-compatible reader with the same validation rules
+✔ Swappable input source for every prompt (use_input), for recording and replaying sessions
+"""
+
+
+class InvalidInput(ValueError):
+    """Raised by a parser to reject an entry. The message is shown to the player."""
+
+
+class TooManyAttempts(RuntimeError):
+    """Raised when a prompt receives more invalid entries than allowed."""
+
+
+# Read by ask() when no input_func is given; see use_input()
+_input_source = None
+
+
+# -------------------------
+#    PARSERS
+# -------------------------
+
+def choice(options, message="Invalid input. Please, choose a valid option."):
+    """Accepts one of `options` (case-insensitive, surrounding spaces ignored)."""
+    options = frozenset(options)
+
+    def parse(raw):
+        value = raw.strip().lower()
+        if value not in options:
+            raise InvalidInput(message)
+        return value
+    return parse
+
+
+def integer(minimum=None, maximum=None,
+            message="Invalid input. Please enter a number.",
+            range_message="Invalid input. Please enter a number in range."):
+    """Accepts a whole number, optionally bounded by `minimum`/`maximum` (inclusive)."""
+    def parse(raw):
+        try:
+            value = int(raw.strip())
+        except ValueError:
+            raise InvalidInput(message) from None
+        if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+            raise InvalidInput(range_message)
+        return value
+    return parse
+
+
+def text(raw):
+    """Accepts any entry, with surrounding spaces removed."""
+    return raw.strip()
+
+
+# -------------------------
+#    PROMPTS
+# -------------------------
+
+def ask(prompt, parse, max_attempts=None, input_func=None, output_func=print):
+    """
+    Prompts until `parse` accepts the entry and returns the parsed value.
+    Raises TooManyAttempts after `max_attempts` invalid entries (unbounded by default).
+    """
+    read = input_func or _input_source or input
+    attempts = 0
+    while True:
+        try:
+            return parse(read(prompt))
+        except InvalidInput as error:
+            attempts = _reject(error, attempts, max_attempts, output_func)
+
+
+async def ask_async(prompt, parse, max_attempts=None, reader=None, output_func=print):
+    """
+    Awaitable version of ask().
+    `reader` is any object with an async readline() (e.g. asyncio.StreamReader);
+    without one, stdin is read in a worker thread so the event loop keeps running.
+    """
+    import asyncio  # Only async callers pay for importing asyncio
+
+    attempts = 0
+    while True:
+        if reader is None:
+            raw = await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+        else:
+            output_func(prompt)
+            raw = await reader.readline()
+            if not raw:
+                raise EOFError("Input stream closed")
+            if isinstance(raw, bytes):
+                raw = raw.decode(errors="replace")
+        try:
+            return parse(raw)
+        except InvalidInput as error:
+            attempts = _reject(error, attempts, max_attempts, output_func)
+
+
+class use_input:
+    """
+    Makes every ask() inside the with-block that has no input_func of its
+    own call `read(prompt)` instead of input(), e.g. to record or replay a
+    whole game session. (A plain class, so the games don't import contextlib.)
+    """
+    def __init__(self, read):
+        self.read = read
+        self.previous = None
+
+    def __enter__(self):
+        global _input_source
+        self.previous, _input_source = _input_source, self.read
+        return self.read
+
+    def __exit__(self, *exc_info):
+        global _input_source
+        _input_source = self.previous
+        return False
+
+
+def _reject(error, attempts, max_attempts, output_func):
+    """Reports an invalid entry and returns the updated attempt count."""
+    output_func(str(error))
+    attempts += 1
+    if max_attempts is not None and attempts >= max_attempts:
+        raise TooManyAttempts(f"Gave up after {attempts} invalid entries") from error
+    return attempts
@@ -0,0 +1,303 @@
+"""
+Description:
+Strategy lab for Higher-Lower-Same. Plays large batches of headless games
+with the game's own scoring (check_guess_and_points: win or lose the current
+card's value, 10/J/Q/K all worth 10) to estimate the expected score of
+different guessing strategies, and solves small shoes exactly with dynamic
+programming to find the optimal play.
+
+A game deals a freshly shuffled shoe and the player guesses until the shoe
+runs out, the turn limit is reached or the strategy quits. Only card values
+matter for scoring, so shoes are simulated as arrays of values.
+
+Key Features:
+✔ Built-in strategies: naive (always higher), threshold and card counting
+✔ Batch simulation across a concurrent.futures.ProcessPoolExecutor, reproducible per seed and worker count
+✔ Exact expected score and variance for any strategy, and for optimal play, on small shoes
+✔ EV / variance report per strategy and shoe size
+
+Usage:
+python higher_lower_sim.py --games 1000000 --decks 1 2 6
+python higher_lower_sim.py --games 0 --solve-suits 1 2
+"""
+import argparse
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import getitem
+
+from Higher_lower_Same import RANK_VALUES, CardCounter, check_guess_and_points, count_outcomes
+
+GUESSES = ('h', 'l', 's')
+
+# Distinct card values, and a representative card code for each
+VALUES = tuple(sorted(set(RANK_VALUES)))
+VALUE_CARDS = {value: RANK_VALUES.index(value) for value in VALUES}
+
+# POINTS[guess][value][next_value]: points scored by check_guess_and_points
+POINTS = {
+    guess: [
+        [check_guess_and_points(VALUE_CARDS[value], VALUE_CARDS[next_value], guess)
+         if value in VALUE_CARDS and next_value in VALUE_CARDS else 0
+         for next_value in range(VALUES[-1] + 1)]
+        for value in range(VALUES[-1] + 1)
+    ]
+    for guess in GUESSES
+}
+
+
+def shoe_counts(num_decks=1, suits=4):
+    """Cards left per value (list indexed by card value) in a fresh shoe."""
+    counts = [0] * (VALUES[-1] + 1)
+    for value in RANK_VALUES:
+        counts[value] += suits * num_decks
+    return counts
+
+
+def build_value_shoe(num_decks=1, suits=4):
+    """An unshuffled shoe as an array of card values."""
+    return array('B', RANK_VALUES * suits) * num_decks
+
+
+# -------------------------
+#    STRATEGIES
+# -------------------------
+
+# A strategy has a `name` and a choose(value, counts, remaining) method that
+# gets the current card value, the cards left per value (after the current
+# card was dealt) and the number of cards left, and returns 'h', 'l', 's' or 'q'.
+
+class FixedStrategy:
+    """Guesses from the current card value alone, using a value -> guess table."""
+    def __init__(self, name, guesses):
+        self.name = name
+        self.guesses = dict(guesses)
+        # Points for every (value, next_value) pair, for the simulation fast path
+        self.pair_points = [POINTS[self.guesses[value]][value] if value in self.guesses else None
+                            for value in range(VALUES[-1] + 1)]
+
+    def choose(self, value, counts, remaining):
+        return self.guesses[value]
+
+
+class CountingStrategy:
+    """
+    Makes the guess most likely to be right given the cards left in the
+    shoe (see Higher_lower_Same.CardCounter). With `quit_below` set, quits once the best guess is worth less
+    than that many points on average.
+    """
+    def __init__(self, name="counting", quit_below=None):
+        self.name = name
+        self.quit_below = quit_below
+
+    def choose(self, value, counts, remaining):
+        if not remaining:
+            return 'q'
+        higher, lower, same = count_outcomes(value, counts, remaining)
+        best = max((higher, 'h'), (lower, 'l'), (same, 's'))
+        if self.quit_below is not None and value * (2 * best[0] - remaining) < self.quit_below * remaining:
+            return 'q'
+        return best[1]
+
+
+def naive_strategy():
+    return FixedStrategy("naive", {value: 'h' for value in VALUES})
+
+
+def threshold_strategy(threshold=8):
+    """Guesses higher below `threshold` and lower from it upwards."""
+    return FixedStrategy(f"threshold-{threshold}",
+                         {value: 'h' if value < threshold else 'l' for value in VALUES})
+
+
+STRATEGIES = {
+    "naive": naive_strategy,
+    "threshold": threshold_strategy,
+    "counting": CountingStrategy,
+}
+
+
+# -------------------------
+#    SIMULATION
+# -------------------------
+
+def play_game(strategy, shoe, rng=random, turns=None, counts=None):
+    """
+    Shuffles `shoe` (an array of card values) in place and plays one game.
+    `counts` is the shoe's cards per value (see shoe_counts()), computed
+    from the shoe when not given. Returns the final score.
+    """
+    rng.shuffle(shoe)
+    guesses = len(shoe) - 1 if turns is None else min(turns, len(shoe) - 1)
+
+    pair_points = getattr(strategy, "pair_points", None)
+    if pair_points is not None:
+        # The guess only depends on the current card: score all pairs at once
+        return sum(map(getitem, map(pair_points.__getitem__, shoe[:guesses]), shoe[1:guesses + 1]))
+
+    if counts is None:
+        counts = [shoe.count(value) for value in range(VALUES[-1] + 1)]
+    counter = CardCounter.from_counts(counts)
+    score = 0
+    value = shoe[0]
+    counter.deal_value(value)
+    for position in range(1, guesses + 1):
+        guess = strategy.choose(value, counter.counts, counter.remaining)
+        if guess == 'q':
+            break
+        next_value = shoe[position]
+        score += POINTS[guess][value][next_value]
+        counter.deal_value(next_value)
+        value = next_value
+    return score
+
+
+def _run_batch(strategy, num_games, num_decks, suits, turns, seed):
+    """Worker entry point: plays `num_games` games and returns the score moments."""
+    rng = random.Random(seed)
+    shoe = build_value_shoe(num_decks, suits)
+    counts = shoe_counts(num_decks, suits)
+    total = total_squares = 0
+    started = time.perf_counter()
+    for _ in range(num_games):
+        score = play_game(strategy, shoe, rng, turns, counts)
+        total += score
+        total_squares += score * score
+    return {"games": num_games, "total": total, "total_squares": total_squares,
+            "seconds": time.perf_counter() - started}
+
+
+def simulate(strategy, num_games, num_decks=1, suits=4, turns=None, workers=None, seed=0):
+    """
+    Plays `num_games` games of `strategy` across `workers` processes.
+    Returns the mean score, its variance and the throughput.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, num_games or 1))
+    batches = [num_games // workers + (index < num_games % workers) for index in range(workers)]
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_run_batch(strategy, num_games, num_decks, suits, turns, seed)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_run_batch, strategy, games, num_decks, suits, turns, seed + index)
+                       for index, games in enumerate(batches)]
+            results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    games = sum(result["games"] for result in results)
+    total = sum(result["total"] for result in results)
+    total_squares = sum(result["total_squares"] for result in results)
+    mean = total / games if games else 0.0
+    variance = total_squares / games - mean * mean if games else 0.0
+    return {
+        "strategy": strategy.name,
+        "decks": num_decks,
+        "suits": suits,
+        "games": games,
+        "ev": mean,
+        "variance": variance,
+        "std_error": (variance / games) ** 0.5 if games else 0.0,
+        "seconds": elapsed,
+        "games_per_sec": games / elapsed if elapsed else 0.0,
+    }
+
+
+# -------------------------
+#    EXACT SOLVER
+# -------------------------
+
+def solve(num_decks=1, suits=1, strategy=None):
+    """
+    Exact expected score and variance for a small shoe by dynamic programming
+    over (cards left per value, current card value). With strategy=None the
+    optimal policy (including when to quit) is used; otherwise `strategy` is
+    evaluated exactly. The number of states grows as the product of
+    (count + 1) over the values, so keep the shoe small (suits=1 or 2).
+    Returns {"ev": ..., "variance": ..., "states": ...}.
+    """
+    @lru_cache(maxsize=None)
+    def moments(counts, value):
+        """(E[score], E[score^2]) from here on, with `value` face up."""
+        remaining = sum(counts)
+        if not remaining:
+            return 0.0, 0.0
+        if strategy is None:
+            options = GUESSES
+        else:
+            guess = strategy.choose(value, counts, remaining)
+            if guess == 'q':
+                return 0.0, 0.0
+            options = (guess,)
+
+        best = (0.0, 0.0)  # Quitting
+        for guess in options:
+            points = POINTS[guess][value]
+            mean = second = 0.0
+            for next_value in VALUES:
+                count = counts[next_value]
+                if not count:
+                    continue
+                probability = count / remaining
+                left = counts[:next_value] + (count - 1,) + counts[next_value + 1:]
+                future_mean, future_second = moments(left, next_value)
+                gain = points[next_value]
+                mean += probability * (gain + future_mean)
+                second += probability * (gain * gain + 2 * gain * future_mean + future_second)
+            if strategy is not None or mean > best[0]:
+                best = (mean, second)
+        return best
+
+    counts = tuple(shoe_counts(num_decks, suits))
+    total = sum(counts)
+    mean = second = 0.0
+    for value in VALUES:
+        if counts[value]:
+            left = counts[:value] + (counts[value] - 1,) + counts[value + 1:]
+            future_mean, future_second = moments(left, value)
+            mean += counts[value] / total * future_mean
+            second += counts[value] / total * future_second
+    return {"ev": mean, "variance": second - mean * mean, "states": moments.cache_info().currsize}
+
+
+# -------------------------
+#    REPORT
+# -------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Higher-Lower-Same strategies.")
+    parser.add_argument("--games", type=int, default=100000, help="simulated games per strategy and shoe")
+    parser.add_argument("--decks", type=int, nargs="+", default=[1, 2, 6], help="shoe sizes to simulate")
+    parser.add_argument("--turns", type=int, default=None, help="guesses per game (default: the whole shoe)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--solve-suits", type=int, nargs="*", default=[1],
+                        help="suits per value for the exact single-deck solver (keep small)")
+    args = parser.parse_args()
+
+    strategies = [naive_strategy(), threshold_strategy(), CountingStrategy()]
+
+    if args.games:
+        print(f"\n===== SIMULATION: {args.games} games per strategy =====")
+        print(f"{'strategy':<14}{'decks':>6}{'EV':>11}{'variance':>13}{'std err':>10}{'games/s':>11}")
+        for num_decks in args.decks:
+            for strategy in strategies:
+                result = simulate(strategy, args.games, num_decks, turns=args.turns,
+                                  workers=args.workers, seed=args.seed)
+                print(f"{result['strategy']:<14}{num_decks:>6}{result['ev']:>11.3f}{result['variance']:>13.1f}"
+                      f"{result['std_error']:>10.3f}{result['games_per_sec']:>11,.0f}")
+
+    for suits in args.solve_suits:
+        print(f"\n===== EXACT: 1 deck with {suits} suit(s), {13 * suits} cards =====")
+        print(f"{'strategy':<14}{'EV':>11}{'variance':>13}{'states':>10}")
+        for strategy in strategies + [None]:
+            result = solve(1, suits, strategy)
+            name = strategy.name if strategy is not None else "optimal"
+            print(f"{name:<14}{result['ev']:>11.3f}{result['variance']:>13.1f}{result['states']:>10}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Description:
+Opt-in instrumentation for the games' hot paths.
+
+Functions decorated with @instrumented count their calls and time spent, but
+only when the CLI_GAMES_INSTRUMENT environment variable is set when the module
+is imported; otherwise the decorator returns the function unchanged, so
+normal play pays nothing. profiled() runs a block under cProfile when
+CLI_GAMES_PROFILE names a directory for the .prof files.
+
+Key Features:
+✔ Per-function call counters and cumulative timers (perf_counter_ns)
+✔ Zero overhead when disabled: undecorated functions are used as-is
+✔ cProfile hook toggled by an environment variable
+✔ Plain-text report and JSON export
+
+Usage:
+CLI_GAMES_INSTRUMENT=1 python cli_games.py
+CLI_GAMES_PROFILE=profiles python -m benchmarks.run
+"""
+import os
+import sys
+import time
+
+ENABLED = os.environ.get("CLI_GAMES_INSTRUMENT", "") not in ("", "0")
+PROFILE_DIRECTORY = os.environ.get("CLI_GAMES_PROFILE") or None
+
+# {name: [calls, total nanoseconds]}
+_counters = {}
+
+
+def instrumented(name=None):
+    """Decorator counting calls to, and time spent in, the decorated function."""
+    def decorate(function):
+        if not ENABLED:
+            return function
+        import functools
+
+        counter = _counters.setdefault(name or f"{function.__module__}.{function.__qualname__}", [0, 0])
+        clock = time.perf_counter_ns
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                counter[0] += 1
+                counter[1] += clock() - started
+        return wrapper
+    return decorate
+
+
+def stats():
+    """Returns {name: {"calls", "total_seconds", "mean_us"}} for every function called so far."""
+    return {
+        name: {"calls": calls, "total_seconds": total / 1e9, "mean_us": total / calls / 1e3}
+        for name, (calls, total) in sorted(_counters.items()) if calls
+    }
+
+
+def reset():
+    for counter in _counters.values():
+        counter[0] = counter[1] = 0
+
+
+def report(file=None):
+    """Prints the counters as a table (to stderr by default, to keep game output clean)."""
+    file = file or sys.stderr
+    rows = stats()
+    if not rows:
+        return
+    print(f"\n{'function':<60}{'calls':>10}{'total s':>10}{'mean us':>10}", file=file)
+    for name, row in rows.items():
+        print(f"{name:<60}{row['calls']:>10}{row['total_seconds']:>10.3f}{row['mean_us']:>10.2f}", file=file)
+
+
+def write_json(path):
+    import json
+
+    with open(path, "w") as handle:
+        json.dump(stats(), handle, indent=2)
+
+
+class profiled:
+    """
+    Context manager that profiles its block with cProfile and writes
+    <CLI_GAMES_PROFILE>/<label>.prof, if that variable is set (otherwise it does nothing).
+    """
+    def __init__(self, label):
+        self.label = label
+        self.profile = None
+
+    def __enter__(self):
+        if PROFILE_DIRECTORY:
+            import cProfile
+
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profile is not None:
+            self.profile.disable()
+            os.makedirs(PROFILE_DIRECTORY, exist_ok=True)
+            self.profile.dump_stats(os.path.join(PROFILE_DIRECTORY, f"{self.label}.prof"))
+        return False
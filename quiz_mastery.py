@@ -0,0 +1,118 @@
+"""
+Description:
+Spaced repetition for the Countries quiz. Tracks how well a player knows each
+(country, question type) item with Leitner boxes and schedules the weakest,
+most overdue items first from a heap. Progress is kept per player in a
+compact binary file that is only read when the player's first question is
+needed.
+
+Key Features:
+✔ Leitner boxes: a correct answer moves an item up a box (longer interval), a wrong one back to box 0
+✔ One heap per box, ordered by due time: O(log n) updates per answer (stale entries are skipped lazily)
+✔ 8 bytes per answered item on disk, written atomically
+"""
+import heapq
+import os
+import re
+import struct
+
+# Answers to wait before asking an item again, per Leitner box
+LEITNER_INTERVALS = (1, 3, 7, 15, 31, 63, 127)
+
+FILE_MAGIC = b"QZM1"
+HEADER = struct.Struct("<4sII")   # magic, clock, number of records
+RECORD = struct.Struct("<2sBBI")  # country code, question type, box, due
+
+
+class MasteryScheduler:
+    """
+    Schedules the weakest due item first: the lowest Leitner box that has
+    an item due, and within that box the item that has been due the longest.
+    `clock` counts the answers given so far and is the unit of the intervals.
+    """
+    def __init__(self, clock=0, items=None):
+        self.clock = clock
+        self.items = dict(items or {})  # {key: (box, due)}
+        # One heap of (due, key) per box
+        self._heaps = [[] for _ in LEITNER_INTERVALS]
+        for key, (box, due) in self.items.items():
+            self._heaps[box].append((due, key))
+        for heap in self._heaps:
+            heapq.heapify(heap)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def record(self, key, correct):
+        """Updates an item after an answer and schedules its next review."""
+        box, _ = self.items.get(key, (0, 0))
+        box = min(box + 1, len(LEITNER_INTERVALS) - 1) if correct else 0
+        self.clock += 1
+        due = self.clock + LEITNER_INTERVALS[box]
+        self.items[key] = (box, due)
+        heapq.heappush(self._heaps[box], (due, key))
+
+    def pop_due(self, force=False):
+        """
+        Removes and returns the weakest item that is due now, or None.
+        With force=True the item due soonest is returned even if not yet due.
+        """
+        earliest = None
+        for box, heap in enumerate(self._heaps):
+            while heap and self.items.get(heap[0][1]) != (box, heap[0][0]):
+                heapq.heappop(heap)  # Stale entry from an earlier answer
+            if not heap:
+                continue
+            if heap[0][0] <= self.clock:
+                return heapq.heappop(heap)[1]
+            if earliest is None or heap[0][0] < self._heaps[earliest][0][0]:
+                earliest = box
+        if force and earliest is not None:
+            return heapq.heappop(self._heaps[earliest])[1]
+        return None
+
+
+class ProgressStore:
+    """Stores each player's MasteryScheduler as a small binary file in `directory`."""
+    def __init__(self, directory="quiz_progress"):
+        self.directory = directory
+
+    def path(self, player):
+        safe_name = re.sub(r"[^\w-]+", "_", player.strip().lower()) or "player"
+        return os.path.join(self.directory, f"{safe_name}.bin")
+
+    def load(self, player):
+        """
+        Returns the player's scheduler (empty for a new player).
+        Raises ValueError if the file is not a quiz progress file or is truncated.
+        """
+        try:
+            with open(self.path(player), "rb") as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            return MasteryScheduler()
+
+        if len(data) < HEADER.size or data[:len(FILE_MAGIC)] != FILE_MAGIC:
+            raise ValueError(f"{self.path(player)} is not a quiz progress file")
+        _, clock, count = HEADER.unpack_from(data)
+        if len(data) != HEADER.size + count * RECORD.size:
+            raise ValueError(f"{self.path(player)} is truncated or damaged")
+        items = {}
+        for offset in range(HEADER.size, HEADER.size + count * RECORD.size, RECORD.size):
+            code, question_type, box, due = RECORD.unpack_from(data, offset)
+            items[(code.decode(), question_type)] = (box, due)
+        return MasteryScheduler(clock, items)
+
+    def save(self, player, scheduler):
+        os.makedirs(self.directory, exist_ok=True)
+        chunks = [HEADER.pack(FILE_MAGIC, scheduler.clock, len(scheduler.items))]
+        chunks.extend(RECORD.pack(code.encode(), question_type, box, due)
+                      for (code, question_type), (box, due) in scheduler.items.items())
+
+        path = self.path(player)
+        with open(path + ".tmp", "wb") as handle:
+            handle.write(b"".join(chunks))
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,208 @@
+"""
+Description:
+Server mode for the Countries quiz. Hosts many concurrent quiz sessions over
+a plain-text line protocol on TCP, using asyncio. Each connection gets its
+own Quiz and QuestionGenerator, while the country dataset (and its distractor
+index) is loaded once and shared read-only by every session.
+
+Protocol (one line per message, UTF-8):
+    server: WELCOME <text>
+    server: Q <n>/<total> <question> [A) ... | B) ... | ...]
+    client: <answer>           (a letter or the answer text)
+    server: ERROR <text>       (a blank answer; the question is sent again, and
+                                the session ends after MAX_ATTEMPTS in a row)
+    server: CORRECT score=<score>   or   INCORRECT answer=<answer> score=<score>
+    server: DONE score=<score>/<asked>
+    client: STATS              -> server: STATS sessions=... answers=... p50=...ms p95=...ms p99=...ms
+                                  (then the current question again)
+    client: QUIT               -> server: BYE
+
+Try it with: python quiz_server.py --port 8765, then nc localhost 8765
+
+Key Features:
+✔ One lightweight session per connection; the immutable dataset is shared
+✔ Small per-connection read buffers and an idle timeout, so idle sessions cost little memory
+✔ Answers read with game_input.ask_async(), validated like the console games' prompts
+✔ Per-answer latency percentiles (p50/p95/p99) over a bounded window of recent answers
+"""
+import argparse
+import asyncio
+import time
+from array import array
+
+from Countries_Capitals_Codes import Quiz, QuestionGenerator, QuestionPoolExhausted, load_countries
+from game_input import InvalidInput, TooManyAttempts, ask_async
+
+# Largest accepted line, also the size of each connection's read buffer
+MAX_LINE = 1024
+
+# Blank answers in a row before a session is closed
+MAX_ATTEMPTS = 3
+
+
+def answer(raw):
+    """Accepts any non-blank line, with surrounding spaces removed."""
+    value = raw.strip()
+    if not value:
+        raise InvalidInput("ERROR Blank answer. Answer with a letter or the text.")
+    return value
+
+
+class LatencyTracker:
+    """Keeps the most recent `window` latencies (seconds) in a ring buffer."""
+    def __init__(self, window=10000):
+        self.samples = array('d', [0.0]) * window
+        self.window = window
+        self.count = 0
+
+    def record(self, seconds):
+        self.samples[self.count % self.window] = seconds
+        self.count += 1
+
+    def percentiles(self, points=(50, 95, 99)):
+        """Returns {point: latency in seconds} over the recorded window."""
+        filled = sorted(self.samples[:min(self.count, self.window)])
+        if not filled:
+            return {point: 0.0 for point in points}
+        return {point: filled[min(len(filled) - 1, len(filled) * point // 100)] for point in points}
+
+
+class QuizServer:
+    """
+    Serves the quiz to every client that connects.
+    `dataset` is shared by all sessions; each session only holds its own
+    Quiz, QuestionGenerator and current question.
+    """
+    def __init__(self, dataset=None, num_questions=10, num_choices=4, idle_timeout=300.0,
+                 max_attempts=MAX_ATTEMPTS):
+        self.dataset = dataset if dataset is not None else load_countries()
+        self.dataset.distractors  # Build the shared index before the first client
+        self.num_questions = num_questions
+        self.num_choices = num_choices
+        self.idle_timeout = idle_timeout
+        self.max_attempts = max_attempts
+        self.latency = LatencyTracker()
+        self.sessions = 0
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self.server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+        return self.server
+
+    async def serve_forever(self, host="127.0.0.1", port=8765):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def stats_line(self):
+        percentiles = self.latency.percentiles()
+        return (f"STATS sessions={self.sessions} answers={self.latency.count} "
+                + " ".join(f"p{point}={seconds * 1000:.3f}ms" for point, seconds in percentiles.items()))
+
+    async def handle_client(self, reader, writer):
+        self.sessions += 1
+        quiz = Quiz(QuestionGenerator(self.dataset, num_choices=self.num_choices), self.num_questions)
+        asked = 0
+        try:
+            await self._send(writer, f"WELCOME Countries quiz: {self.num_questions} questions. "
+                                     "Answer with a letter or the text; STATS or QUIT anytime.")
+            while asked < self.num_questions:
+                try:
+                    question = quiz.question_generator.generate_question()
+                except QuestionPoolExhausted:
+                    break
+                asked += 1
+                options = " | ".join(f"{chr(ord('A') + index)}) {choice}"
+                                     for index, choice in enumerate(question.choices))
+                prompt = (f"Q {asked}/{self.num_questions} {question.question_text}"
+                          + (f" [{options}]" if options else ""))
+
+                while True:
+                    line = await self._read_answer(reader, writer, prompt)
+                    if line is None or line.upper() == "QUIT":
+                        await self._send(writer, "BYE")
+                        return
+                    if line.upper() == "STATS":
+                        await self._send(writer, self.stats_line())
+                        continue
+                    break
+
+                started = time.perf_counter()
+                if quiz.check_answer(question, line):
+                    reply = f"CORRECT score={quiz.score}"
+                else:
+                    reply = f"INCORRECT answer={question.answer} score={quiz.score}"
+                await self._send(writer, reply)
+                self.latency.record(time.perf_counter() - started)
+
+            await self._send(writer, f"DONE score={quiz.score}/{asked}")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def _read_answer(self, reader, writer, prompt):
+        """
+        Sends `prompt` and reads the reply through ask_async(). Returns None on
+        disconnect, timeout, an oversized line or too many blank answers.
+        """
+        def send(line):
+            writer.write(line.encode() + b"\n")
+
+        try:
+            return await asyncio.wait_for(ask_async(prompt, answer, self.max_attempts, reader, send),
+                                          self.idle_timeout)
+        except (asyncio.TimeoutError, EOFError, TooManyAttempts, ValueError, asyncio.LimitOverrunError):
+            return None
+
+    @staticmethod
+    async def _send(writer, line):
+        writer.write(line.encode() + b"\n")
+        await writer.drain()
+
+
+async def play_remote(host, port, answers):
+    """
+    Minimal client: plays one session sending `answers` in order.
+    Returns every line received from the server.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    received = []
+    answers = iter(answers)
+    try:
+        while True:
+            line = (await reader.readline()).decode().rstrip("\n")
+            if not line:
+                break
+            received.append(line)
+            if line.startswith(("DONE", "BYE")):
+                break
+            if line.startswith("Q "):
+                writer.write((next(answers, "QUIT") + "\n").encode())
+                await writer.drain()
+    finally:
+        writer.close()
+    return received
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Countries quiz over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--questions", type=int, default=10, help="questions per session")
+    parser.add_argument("--choices", type=int, default=4, help="options per question (0 for free text)")
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="seconds before an idle session is closed")
+    args = parser.parse_args()
+
+    server = QuizServer(num_questions=args.questions, num_choices=args.choices,
+                        idle_timeout=args.idle_timeout)
+    print(f"Quiz server listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n" + server.stats_line())
+
+
+if __name__ == "__main__":
+    main()
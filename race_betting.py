@@ -0,0 +1,117 @@
+"""
+Description:
+Betting market for the Turtle Race. Estimates each racer's chance of winning
+from a large batch of headless races (turtle_race.run_race), turns the
+probabilities into decimal odds and settles bets against a bankroll that is
+kept between games.
+
+Lane order matters: racers move one after the other and a later lane wins
+ties, so the outer lanes win noticeably more often and get shorter odds.
+
+Key Features:
+✔ Win probabilities estimated per race configuration (racers, step size, track length)
+✔ Cached in memory and in a JSON file, so odds are instant after the first estimate
+✔ Fair decimal odds, with an optional house margin
+✔ Persistent bankroll, written atomically after every settled bet
+"""
+import json
+import os
+import random
+from functools import lru_cache
+
+from turtle_race import FINISH_X, MAX_STEP, RAINBOW_COLORS, START_X, run_race
+
+DEFAULT_DIRECTORY = "race_data"
+ODDS_CACHE_FILE = "odds_cache.json"
+BANKROLL_FILE = "bankroll.json"
+
+# Races simulated per estimate; the standard error of each probability is below 0.3%
+DEFAULT_RACES = 20000
+STARTING_BALANCE = 100
+
+
+def _write_json(path, data):
+    """Writes `data` to `path` through a temporary file, so a crash never leaves half a file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w") as handle:
+        json.dump(data, handle, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def estimate_win_probabilities(num_racers, max_step, track_length, races, seed):
+    """Runs `races` headless races and returns each racer's share of the wins."""
+    rng = random.Random(seed)
+    wins = [0] * num_racers
+    for _ in range(races):
+        wins[run_race(num_racers, rng, 0, track_length, max_step).winner] += 1
+    return tuple(count / races for count in wins)
+
+
+@lru_cache(maxsize=None)
+def win_probabilities(num_racers=len(RAINBOW_COLORS), max_step=MAX_STEP, track_length=FINISH_X - START_X,
+                      races=DEFAULT_RACES, seed=0, directory=DEFAULT_DIRECTORY):
+    """
+    Win probability per racer (in lane order) for a race configuration.
+    Looked up in the JSON cache in `directory` first; a missing
+    configuration is estimated and added to the cache.
+    """
+    path = os.path.join(directory, ODDS_CACHE_FILE)
+    key = f"racers={num_racers} step=0-{max_step} track={track_length} races={races} seed={seed}"
+    try:
+        with open(path) as handle:
+            cache = json.load(handle)
+    except (FileNotFoundError, ValueError):
+        cache = {}
+
+    if key not in cache:
+        cache[key] = estimate_win_probabilities(num_racers, max_step, track_length, races, seed)
+        _write_json(path, cache)
+    return tuple(cache[key])
+
+
+def decimal_odds(probabilities, margin=0.0):
+    """
+    Decimal odds (total payout per unit staked) for each probability.
+    margin=0 gives fair odds; margin=0.05 shortens every price by 5%.
+    A racer that never won in the estimate gets None (no bets taken).
+    """
+    return tuple(round(1 / (probability * (1 + margin)), 2) if probability else None
+                 for probability in probabilities)
+
+
+class Bankroll:
+    """A player's balance, stored as JSON in `directory` and saved after every bet."""
+    def __init__(self, directory=DEFAULT_DIRECTORY, starting_balance=STARTING_BALANCE):
+        self.path = os.path.join(directory, BANKROLL_FILE)
+        self.starting_balance = starting_balance
+        try:
+            with open(self.path) as handle:
+                data = json.load(handle)
+            self.balance = data["balance"]
+            self.bets = data["bets"]
+        except (FileNotFoundError, ValueError, KeyError):
+            self.balance = starting_balance
+            self.bets = 0
+
+    def reset(self):
+        """Starts over with the starting balance (used once the bankroll is empty)."""
+        self.balance = self.starting_balance
+        self.save()
+
+    def save(self):
+        _write_json(self.path, {"balance": self.balance, "bets": self.bets})
+
+    def settle(self, stake, odds, won):
+        """
+        Settles a bet of `stake` at decimal `odds`.
+        Returns the net result (payout minus stake) and updates the balance.
+        The payout is rounded down to a whole unit.
+        """
+        if not 0 < stake <= self.balance:
+            raise ValueError(f"Stake must be between 1 and {self.balance}.")
+        # Odds have two decimals: work in hundredths so float error can't cost a unit
+        net = stake * round(odds * 100) // 100 - stake if won else -stake
+        self.balance += net
+        self.bets += 1
+        self.save()
+        return net
@@ -0,0 +1,214 @@
+"""
+Description:
+Record and replay game sessions for any game in the cli_games registry.
+
+A recording runs the game with a seeded random.Random, logs every entry the
+player types (with the time it was typed) and a digest of everything the
+game printed. Replaying feeds the same entries to the same seed, with no
+waiting and no terminal I/O, and checks that the game printed exactly the
+same thing, so one recorded session becomes a fast, reproducible regression
+or load test.
+
+Sessions run in a fresh temporary working directory, so saved data (coffee
+machine journal, quiz progress, race bankroll) always starts empty and a
+replay never touches the player's real files.
+
+Log format (text, one entry per line after a JSON header):
+    {"format": 1, "game": "cards", "seed": 42, "digest": "<sha1 of the output>"}
+    <milliseconds since start>\t<entry>
+
+Key Features:
+✔ Seeded randomness and an injected game clock, so a session replays identically
+✔ Compact plain-text log of the player's entries
+✔ Playback at full speed, optionally many times in a row, with an output check
+
+Usage:
+python replay.py record cards session.log
+python replay.py replay session.log --times 1000
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+
+from cli_games import GAMES
+from game_input import use_input
+
+LOG_FORMAT = 1
+
+
+class SessionLog:
+    """A recorded session: the game, its seed, the entries as (milliseconds, text) and the output digest."""
+    def __init__(self, game, seed, entries=None, digest=None):
+        self.game = game
+        self.seed = seed
+        self.entries = entries if entries is not None else []
+        self.digest = digest
+
+    def save(self, path):
+        header = {"format": LOG_FORMAT, "game": self.game, "seed": self.seed, "digest": self.digest}
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(json.dumps(header) + "\n")
+            handle.writelines(f"{milliseconds}\t{entry}\n" for milliseconds, entry in self.entries)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as handle:
+            header = json.loads(handle.readline())
+            if header.get("format") != LOG_FORMAT:
+                raise ValueError(f"{path} is not a session log this version can replay")
+            entries = []
+            for line in handle:
+                milliseconds, _, entry = line.rstrip("\n").partition("\t")
+                entries.append((int(milliseconds), entry))
+        return cls(header["game"], header["seed"], entries, header["digest"])
+
+
+class SessionClock:
+    """Game clock that only moves when an entry is read, so recording and replay see the same times."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Transcript(io.TextIOBase):
+    """Stand-in for stdout that hashes everything written, optionally echoing it to `echo`."""
+    def __init__(self, echo=None):
+        self.echo = echo
+        self.hash = hashlib.sha1()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.hash.update(text.encode("utf-8"))
+        if self.echo is not None:
+            self.echo.write(text)
+        return len(text)
+
+    def flush(self):
+        if self.echo is not None:
+            self.echo.flush()
+
+    def digest(self):
+        return self.hash.hexdigest()
+
+
+@contextmanager
+def _sandbox():
+    """Runs the block in a fresh temporary working directory."""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="cli_games_session_") as directory:
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def _play(game_key, seed, read, clock, transcript):
+    """Plays one session of `game_key` with every prompt answered by `read`."""
+    game = GAMES[game_key]
+    options = {"rng": random.Random(seed), "clock": clock}
+    with _sandbox(), use_input(read), redirect_stdout(transcript):
+        try:
+            game.play(console=True, **{name: options[name] for name in game.options})
+        except (EOFError, KeyboardInterrupt):
+            pass  # The session ended while the game was waiting for an entry
+
+
+def record(game_key, path, seed=None):
+    """Plays `game_key` interactively while recording it to `path`. Returns the SessionLog."""
+    if game_key not in GAMES:
+        raise ValueError(f"Unknown game '{game_key}'. Choose one of: {', '.join(GAMES)}")
+    log = SessionLog(game_key, seed if seed is not None else random.randrange(2 ** 32))
+    clock = SessionClock()
+    transcript = Transcript(echo=sys.stdout)
+    started = time.monotonic()
+
+    def read(prompt):
+        transcript.write(prompt)
+        transcript.flush()
+        entry = input()
+        milliseconds = int((time.monotonic() - started) * 1000)
+        clock.now = milliseconds / 1000
+        log.entries.append((milliseconds, entry))
+        return entry
+
+    try:
+        _play(game_key, log.seed, read, clock, transcript)
+    finally:
+        log.digest = transcript.digest()
+        log.save(path)
+    return log
+
+
+def replay(log, times=1, echo=None):
+    """
+    Replays `log` `times` times at full speed.
+    Returns {"matches": ..., "digest": ..., "seconds": ..., "sessions_per_sec": ...};
+    "matches" is True when every run printed exactly what was recorded.
+    """
+    matches = True
+    digest = None
+    started = time.perf_counter()
+    for _ in range(times):
+        clock = SessionClock()
+        transcript = Transcript(echo)
+        entries = iter(log.entries)
+
+        def read(prompt):
+            transcript.write(prompt)
+            try:
+                milliseconds, entry = next(entries)
+            except StopIteration:
+                raise EOFError("End of the recorded session") from None
+            clock.now = milliseconds / 1000
+            if echo is not None:
+                echo.write(entry + "\n")
+            return entry
+
+        _play(log.game, log.seed, read, clock, transcript)
+        digest = transcript.digest()
+        matches = matches and digest == log.digest
+    elapsed = time.perf_counter() - started
+    return {"matches": matches, "digest": digest, "seconds": elapsed,
+            "sessions_per_sec": times / elapsed if elapsed else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay CLI game sessions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="play a game and record the session")
+    record_parser.add_argument("game", choices=list(GAMES))
+    record_parser.add_argument("path", help="session log to write")
+    record_parser.add_argument("--seed", type=int, default=None, help="seed (default: random)")
+    replay_parser = commands.add_parser("replay", help="replay a recorded session")
+    replay_parser.add_argument("path", help="session log to replay")
+    replay_parser.add_argument("--times", type=int, default=1, help="number of replays")
+    replay_parser.add_argument("--show", action="store_true", help="print the replayed session")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        log = record(args.game, args.path, args.seed)
+        print(f"\nRecorded {len(log.entries)} entries (seed {log.seed}) to {args.path}")
+        return 0
+
+    log = SessionLog.load(args.path)
+    result = replay(log, args.times, echo=sys.stdout if args.show else None)
+    print(f"Replayed {log.game} {args.times} time(s) in {result['seconds']:.3f}s "
+          f"({result['sessions_per_sec']:,.1f} sessions/sec): "
+          + ("output matches the recording" if result["matches"] else "OUTPUT DIFFERS from the recording"))
+    return 0 if result["matches"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from Coffee_Machine import CoffeeMachine
+from coffee_journal import LOG_MAGIC, TransactionJournal
+
+TWO_EURO = (0, 0, 0, 0, 0, 0, 0, 1)
+
+
+def journaled_machine(directory, **options):
+    machine = CoffeeMachine()
+    replayed = machine.attach_journal(TransactionJournal(str(directory), **options))
+    return machine, replayed
+
+
+def test_committed_batches_survive_without_close(tmp_path):
+    machine, _ = journaled_machine(tmp_path)
+    for _ in range(10):
+        machine.process_orders([("espresso", TWO_EURO)])
+    # No close(): the process dies here
+
+    restored, replayed = journaled_machine(tmp_path)
+    assert replayed == 10
+    assert restored.machine_state == machine.machine_state
+    assert restored.changer.counts == machine.changer.counts
+
+
+def serve_espressos(machine, count):
+    for _ in range(count):
+        machine.process_orders([("espresso", TWO_EURO)])
+
+
+def test_restore_loads_snapshot_and_replays_log_tail(tmp_path):
+    machine, _ = journaled_machine(tmp_path, snapshot_every=5)
+    serve_espressos(machine, 7)  # Snapshot after 5, then 2 records in the log
+
+    restored, replayed = journaled_machine(tmp_path, snapshot_every=5)
+    assert replayed == 2
+    assert restored.machine_state == machine.machine_state
+    assert list(restored.reservoir.levels) == list(machine.reservoir.levels)
+
+
+def test_torn_final_record_is_ignored_and_dropped(tmp_path):
+    machine, _ = journaled_machine(tmp_path)
+    serve_espressos(machine, 3)
+    log_path = machine.journal.log_path
+    with open(log_path, "ab") as handle:
+        handle.write(b"\x04\x00\x00")  # Half-written fourth record
+
+    restored, replayed = journaled_machine(tmp_path)
+    assert replayed == 3
+    assert restored.machine_state == machine.machine_state
+    serve_espressos(restored, 1)  # New records follow the last good one
+
+    again, replayed = journaled_machine(tmp_path)
+    assert replayed == 4
+    assert again.machine_state["drinks_served"]["espresso"] == 4
+
+
+def test_corrupt_record_stops_replay_at_last_good_record(tmp_path):
+    machine, _ = journaled_machine(tmp_path)
+    serve_espressos(machine, 3)
+    with open(machine.journal.log_path, "r+b") as handle:
+        handle.seek(-1, os.SEEK_END)
+        last = handle.read(1)
+        handle.seek(-1, os.SEEK_END)
+        handle.write(bytes([last[0] ^ 0xFF]))  # Fails the third record's CRC
+
+    restored, replayed = journaled_machine(tmp_path)
+    assert replayed == 2
+    assert restored.machine_state["drinks_served"]["espresso"] == 2
+
+
+def test_layout_mismatch_is_rejected(tmp_path):
+    machine, _ = journaled_machine(tmp_path)
+    serve_espressos(machine, 1)
+
+    other = CoffeeMachine()
+    other.machine_state["drinks_served"]["mocha"] = 0
+    with pytest.raises(ValueError, match="different machine layout"):
+        other.attach_journal(TransactionJournal(str(tmp_path)))
+
+
+def test_foreign_log_is_rejected(tmp_path):
+    (tmp_path / "transactions.log").write_bytes(b"not a journal at all")
+    with pytest.raises(ValueError, match="not a coffee machine journal file"):
+        journaled_machine(tmp_path)
+
+
+@pytest.mark.parametrize("size", [0, 3, len(LOG_MAGIC) + 2])
+def test_log_cut_short_in_its_header_counts_as_empty(tmp_path, size):
+    machine, _ = journaled_machine(tmp_path, snapshot_every=2)
+    serve_espressos(machine, 2)  # Snapshot, then a fresh log
+    log_path = machine.journal.log_path
+    with open(log_path, "r+b") as handle:
+        handle.truncate(size)
+
+    restored, replayed = journaled_machine(tmp_path, snapshot_every=2)
+    assert replayed == 0
+    assert restored.machine_state == machine.machine_state
+    serve_espressos(restored, 1)
+
+    again, replayed = journaled_machine(tmp_path, snapshot_every=2)
+    assert replayed == 1
+    assert again.machine_state["drinks_served"]["espresso"] == 3
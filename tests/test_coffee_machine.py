@@ -0,0 +1,108 @@
+import itertools
+import operator
+import random
+
+from Coffee_Machine import (CoffeeMachine, CoinChanger, MAX_COINS_PER_DENOMINATION, REJECTED_INVALID_COINS,
+                            SERVED)
+from game_input import use_input
+
+# 2 x 2 euro: pays for any drink on the menu
+TWO_EURO_COINS = (0, 0, 0, 0, 0, 0, 0, 2)
+
+
+def test_process_orders_rejects_negative_coin_counts():
+    machine = CoffeeMachine()
+    inventory = machine.changer.inventory
+    result = machine.process_orders([("espresso", (-100, 0, 0, 0, 0, 0, 0, 2))])
+    assert list(result.outcomes) == [REJECTED_INVALID_COINS]
+    assert list(result.change) == [0]
+    assert machine.changer.inventory == inventory
+    assert machine.machine_state["money"] == 0
+
+
+def test_process_orders_rejects_wrong_number_of_denominations():
+    machine = CoffeeMachine()
+    result = machine.process_orders([("espresso", (0, 2)), ("espresso", TWO_EURO_COINS)])
+    assert list(result.outcomes) == [REJECTED_INVALID_COINS, SERVED]
+
+
+def brute_force_change(values, counts, amount):
+    """Fewest coins making `amount` from `counts`, by trying every combination (None if impossible)."""
+    best = None
+    for coins in itertools.product(*(range(count + 1) for count in counts)):
+        if sum(map(operator.mul, coins, values)) == amount and (best is None or sum(coins) < best):
+            best = sum(coins)
+    return best
+
+
+def test_make_change_matches_brute_force():
+    rng = random.Random(0)
+    denominations = {"one": 1, "two": 2, "five": 5, "ten": 10, "twenty": 20, "fifty": 50}
+    values = tuple(denominations.values())
+    for _ in range(300):
+        inventory = {name: rng.randint(0, 3) for name in denominations}
+        changer = CoinChanger(denominations, inventory, max_change=100)
+        counts = list(changer.counts)
+        amount = rng.randint(0, 120)
+
+        change = changer.make_change(amount)
+        expected = brute_force_change(values, counts, amount)
+        if expected is None:
+            assert change is None
+            assert changer.counts == counts
+        else:
+            assert sum(map(operator.mul, change, values)) == amount
+            assert sum(change) == expected
+            assert all(map(operator.le, change, counts))
+            assert changer.counts == [held - used for held, used in zip(counts, change)]
+
+
+def test_make_change_beyond_inventory_value_fails_without_growing_table():
+    changer = CoffeeMachine().changer
+    table_size = len(changer._solutions)
+    assert changer.make_change(changer.total + 1) is None
+    assert changer.make_change(1_000_000) is None
+    assert len(changer._solutions) == table_size
+
+
+def test_huge_overpayment_never_grows_the_shared_table():
+    changer = CoffeeMachine().changer
+    table_size = len(changer._solutions)
+    change = changer.pay((0,) * 7 + (5000,), 150)  # Deposited first, so the inventory covers it
+    assert sum(map(operator.mul, change, changer.values)) == 5000 * 200 - 150
+    assert len(changer._solutions) == table_size
+    assert len(CoffeeMachine().changer._solutions) == table_size
+
+
+def test_process_orders_caps_coins_per_denomination():
+    machine = CoffeeMachine()
+    table_size = len(machine.changer._solutions)
+    too_many = (0,) * 7 + (MAX_COINS_PER_DENOMINATION + 1,)
+    most = (0,) * 7 + (MAX_COINS_PER_DENOMINATION,)
+    result = machine.process_orders([("espresso", too_many), ("espresso", most)])
+    assert list(result.outcomes) == [REJECTED_INVALID_COINS, SERVED]
+    assert list(result.change) == [0, MAX_COINS_PER_DENOMINATION * 200 - 150]
+    assert len(machine.changer._solutions) == table_size
+
+
+def test_bounded_change_results_are_cached_per_inventory_state():
+    denominations = {"one": 1, "two": 2, "five": 5}
+    changer = CoinChanger(denominations, {"one": 0, "two": 1, "five": 1}, max_change=10)
+    assert changer.make_change(3) is None
+    assert changer._fallback == {(3, (0, 1, 1)): None}
+    assert changer.make_change(3) is None
+    assert len(changer._fallback) == 1
+
+
+def test_run_refill_option_restores_an_empty_reservoir(capsys):
+    machine = CoffeeMachine()
+    for position in range(len(machine.reservoir.levels)):
+        machine.reservoir.levels[position] = 0
+    latte = ["c", "2", "0", "0", "0", "0", "0", "0", "0", "2"]
+    entries = iter(["c", "2", "f"] + latte + ["o"])
+    with use_input(lambda prompt="": next(entries)):
+        machine.run()
+    output = capsys.readouterr().out
+    assert "Latte is unavailable until the machine is refilled" in output
+    assert "Reservoir refilled." in output
+    assert machine.machine_state["drinks_served"]["latte"] == 1
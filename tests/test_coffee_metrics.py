@@ -0,0 +1,16 @@
+from Coffee_Machine import CoffeeMachine
+from coffee_metrics import CoffeeMetrics, _label_text
+
+
+def test_label_values_are_escaped():
+    assert _label_text({"machine": 'a"b\\c\nd'}) == '{machine="a\\"b\\\\c\\nd"}'
+
+
+def test_awkward_machine_id_keeps_one_sample_per_line():
+    machine = CoffeeMachine()
+    metrics = machine.attach_metrics(CoffeeMetrics(machine, 'lobby "B"\\\n2'))
+    machine.process_orders([("espresso", (0, 0, 0, 0, 0, 0, 0, 1))])
+    text = metrics.registry.render_prometheus()
+    assert 'coffee_orders_total{machine="lobby \\"B\\"\\\\\\n2",outcome="served"} 1' in text.splitlines()
+    for line in text.splitlines():
+        assert line.startswith(("# HELP coffee_", "# TYPE coffee_", "coffee_"))
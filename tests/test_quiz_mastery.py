@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from Countries_Capitals_Codes import AdaptiveQuestionGenerator, Quiz, load_countries
+from game_input import use_input
+from quiz_mastery import HEADER, MasteryScheduler, ProgressStore
+
+
+def test_progress_round_trips(tmp_path):
+    store = ProgressStore(str(tmp_path))
+    scheduler = MasteryScheduler()
+    scheduler.record(("FR", 0), True)
+    scheduler.record(("DE", 1), False)
+    store.save("Ana", scheduler)
+
+    loaded = store.load("Ana")
+    assert loaded.clock == scheduler.clock
+    assert loaded.items == scheduler.items
+
+
+@pytest.mark.parametrize("keep", [0, 3, HEADER.size, HEADER.size + 5])
+def test_truncated_progress_file_raises_value_error(tmp_path, keep):
+    store = ProgressStore(str(tmp_path))
+    scheduler = MasteryScheduler()
+    scheduler.record(("FR", 0), True)
+    scheduler.record(("DE", 1), False)
+    store.save("Ana", scheduler)
+    path = store.path("Ana")
+    with open(path, "r+b") as handle:
+        handle.truncate(keep)
+
+    with pytest.raises(ValueError):
+        store.load("Ana")
+
+
+def test_damaged_progress_file_starts_afresh(tmp_path, capsys):
+    store = ProgressStore(str(tmp_path))
+    (tmp_path / "ana.bin").write_bytes(b"QZM1\x00")
+    generator = AdaptiveQuestionGenerator(load_countries(), "Ana", store, rng=random.Random(0))
+    assert generator.generate_question() is not None
+    assert "Could not read your saved progress" in capsys.readouterr().out
+
+
+def test_interrupted_quiz_keeps_answers_given(tmp_path):
+    store = ProgressStore(str(tmp_path))
+    generator = AdaptiveQuestionGenerator(load_countries(), "Ana", store, rng=random.Random(0))
+    entries = iter(["Paris", "Berlin"])
+
+    def read(prompt=""):
+        answer = next(entries, None)
+        if answer is None:
+            raise EOFError
+        return answer
+
+    with use_input(read), pytest.raises(EOFError):
+        Quiz(generator, num_questions=5).start()
+    assert len(store.load("Ana")) == 2
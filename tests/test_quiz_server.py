@@ -0,0 +1,30 @@
+import asyncio
+
+from quiz_server import QuizServer, play_remote
+
+
+def play(server, answers):
+    async def session():
+        listener = await server.start(port=0)
+        try:
+            return await play_remote("127.0.0.1", listener.sockets[0].getsockname()[1], answers)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+    return asyncio.run(session())
+
+
+def test_blank_answers_are_rejected_then_close_the_session():
+    server = QuizServer(num_questions=2, max_attempts=2)
+    lines = play(server, ["", "", "A"])
+    assert lines[1].startswith("Q 1/2")
+    assert lines[2].startswith("ERROR")
+    assert lines[3] == lines[1]  # The question is asked again
+    assert lines[4:] == ["ERROR Blank answer. Answer with a letter or the text.", "BYE"]
+
+
+def test_session_runs_to_completion():
+    server = QuizServer(num_questions=2)
+    lines = play(server, ["A", "B"])
+    assert lines[-1].startswith("DONE score=")
+    assert sum(line.startswith(("CORRECT", "INCORRECT")) for line in lines) == 2
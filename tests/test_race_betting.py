@@ -0,0 +1,16 @@
+import pytest
+
+from race_betting import Bankroll
+
+
+@pytest.mark.parametrize("stake, odds, payout", [(45, 5.60, 252), (50, 5.02, 251), (10, 2.5, 25), (3, 1.15, 3)])
+def test_winning_bet_pays_stake_times_odds_rounded_down(tmp_path, stake, odds, payout):
+    bankroll = Bankroll(str(tmp_path), starting_balance=100)
+    assert bankroll.settle(stake, odds, won=True) == payout - stake
+    assert bankroll.balance == 100 - stake + payout
+
+
+def test_losing_bet_costs_the_stake(tmp_path):
+    bankroll = Bankroll(str(tmp_path), starting_balance=100)
+    assert bankroll.settle(30, 4.0, won=False) == -30
+    assert Bankroll(str(tmp_path)).balance == 70
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from turtle_race import FINISH_X, MAX_STEP, RAINBOW_COLORS, START_X, run_race
+
+
+def original_race(steps, start_x=START_X, finish_x=FINISH_X):
+    """
+    The original turtle game loop, fed with recorded steps (steps[racer][round])
+    instead of random.randint(). Returns (winner, rounds).
+    """
+    positions = [start_x] * len(steps)
+    winner = None
+    rounds = 0
+    race_on = True
+    while race_on:
+        for racer in range(len(steps)):
+            positions[racer] += steps[racer][rounds]
+            if positions[racer] > finish_x:
+                race_on = False
+                winner = racer
+        rounds += 1
+    return winner, rounds
+
+
+class ScriptedRng:
+    """Stands in for random: choices() hands each racer its scripted steps, then zeros."""
+    def __init__(self, steps):
+        self.steps = steps
+        self.calls = 0
+
+    def choices(self, population, k):
+        racer_steps = self.steps[self.calls % len(self.steps)]
+        self.calls += 1
+        return (list(racer_steps) + [0] * k)[:k]
+
+
+def test_engine_matches_original_loop():
+    rng = random.Random(0)
+    for _ in range(5000):
+        result = run_race(rng=rng, keep_positions=True)
+        assert len(result.positions) == len(RAINBOW_COLORS)
+        steps = []
+        for track in result.positions:
+            assert len(track) == result.rounds + 1
+            assert track[0] == START_X
+            racer_steps = [after - before for before, after in zip(track, track[1:])]
+            assert all(0 <= step <= MAX_STEP for step in racer_steps)
+            steps.append(racer_steps)
+
+        assert original_race(steps) == (result.winner, result.rounds)
+
+
+def test_last_racer_in_lane_order_wins_a_shared_crossing():
+    # Racers 1 and 2 both cross in round 2; racer 0 would only cross in round 3
+    steps = [[5, 5, 5], [6, 6], [6, 6]]
+    result = run_race(num_racers=3, rng=ScriptedRng(steps), start_x=0, finish_x=10, keep_positions=True)
+    assert (result.winner, result.rounds) == (2, 2)
+    assert result.positions == [[0, 5, 10], [0, 6, 12], [0, 6, 12]]
+    assert original_race(steps, start_x=0, finish_x=10) == (2, 2)
+
+
+def test_race_ends_after_the_first_crossing_round():
+    # Racer 0 crosses in round 1; racer 2 would get further, but only in round 2
+    steps = [[11], [0, 0], [10, 10]]
+    result = run_race(num_racers=3, rng=ScriptedRng(steps), start_x=0, finish_x=10)
+    assert (result.winner, result.rounds) == (0, 1)
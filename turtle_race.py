@@ -2,58 +2,238 @@
 Description:
 This Python project simulates a colorful Turtle Race using the turtle module. Players place a bet on which turtle will win before the race begins. Once the race starts, each turtle moves forward by a random distance, creating an exciting and unpredictable competition. The game announces the winner at the end and displays whether the player's bet was correct.
 
+The race itself is computed by a headless engine (run_race), which needs no display and runs thousands of races per second. The turtle window is only a renderer that replays the finished race.
+
 Key Features:
 ✔ Interactive betting system where players choose a turtle color before the race
+✔ Odds for every turtle and a bankroll kept between races (see race_betting.py)
 ✔ Six turtles, each with a unique color, racing across the screen
 ✔ Randomized movement to ensure unpredictable race outcomes
 ✔ Visual winner announcement using a separate turtle for messages
 ✔ Closes the screen on user click after displaying results
+✔ Headless race engine; the turtle graphics are imported only when a race is shown
+
+Usage:
+python turtle_race.py                     # watch a race and bet on it
+python turtle_race.py --console           # bet and follow the race in the terminal
+python turtle_race.py --headless 10000    # run races without a window and print the win counts
 """
-from turtle import Turtle, Screen
+import argparse
 import random
+import time
+from bisect import bisect_right
+from itertools import accumulate
+
+from game_input import ask, integer, text
+from instrumentation import instrumented
+
+RAINBOW_COLORS = ("red", "orange", "yellow", "green", "blue", "purple")
+Y_POSITIONS = (-70, -40, -10, 20, 50, 80)
+START_X = -230
+FINISH_X = 260  # A turtle finishes once its x coordinate is greater than this
+MAX_STEP = 10   # Each turtle moves random.randint(0, MAX_STEP) per round
+
+# Rounds of steps drawn at a time; almost every race ends within the first block
+ROUNDS_PER_BLOCK = 128
+
+
+class RaceResult:
+    """
+    Outcome of one race: the winner's index, the number of rounds and, if
+    kept, every racer's x position after each round (positions[racer][round],
+    with round 0 being the start line).
+    """
+    def __init__(self, winner, rounds, positions=None):
+        self.winner = winner
+        self.rounds = rounds
+        self.positions = positions
+
+
+@instrumented()
+def run_race(num_racers=len(RAINBOW_COLORS), rng=random, start_x=START_X, finish_x=FINISH_X,
+             max_step=MAX_STEP, keep_positions=False):
+    """
+    Runs one race without any graphics.
+
+    Every round each racer moves in list order, and the race ends after the
+    first round in which any racer is past `finish_x`. If several racers
+    cross in that round, the last of them in list order wins, as in the
+    original game loop where each crossing turtle overwrote the winner.
+    """
+    steps = range(max_step + 1)
+    tracks = [[start_x] for _ in range(num_racers)]
+    while True:
+        # Extend every racer's track by a block of rounds, then find the
+        # round in which each racer first crosses the finish line
+        crossings = []
+        for track in tracks:
+            track.extend(accumulate(rng.choices(steps, k=ROUNDS_PER_BLOCK), initial=track[-1]))
+            del track[-ROUNDS_PER_BLOCK - 1]  # The block's initial value repeats the last position
+            crossings.append(bisect_right(track, finish_x))
+
+        rounds = min(crossings)
+        if rounds < len(tracks[0]):
+            break
+
+    # Last racer in list order among those that crossed in the final round
+    winner = max(racer for racer, crossing in enumerate(crossings) if crossing == rounds)
+    positions = [track[:rounds + 1] for track in tracks] if keep_positions else None
+    return RaceResult(winner, rounds, positions)
+
+
+class TurtleRaceView:
+    """Shows races in a turtle window, replaying the positions computed by run_race()."""
+    def __init__(self, colors=RAINBOW_COLORS, y_positions=Y_POSITIONS, frame_delay=0.02):
+        from turtle import Screen, Turtle  # Only needed when a race is shown
+
+        self.colors = colors
+        self.frame_delay = frame_delay
+        self.screen = Screen()
+        self.screen.setup(width=600, height=400)
+        self.screen.tracer(0)  # Redraw once per round instead of after every move
+
+        self.turtles = []
+        for color, y_position in zip(colors, y_positions):
+            new_turtle = Turtle(shape="turtle")
+            new_turtle.color(color)
+            new_turtle.penup()
+            new_turtle.goto(START_X, y_position)
+            self.turtles.append(new_turtle)
+        self.message_turtle = Turtle()
+        self.message_turtle.hideturtle()
+        self.message_turtle.penup()
+        self.screen.update()
+
+    def ask_bet(self, odds, balance):
+        prices = " | ".join(f"{color} {price}" for color, price in odds.items())
+        return self.screen.textinput(title="Make your bet",
+                                     prompt=f"Odds: {prices}\nBalance: {balance}\n"
+                                            "Which turtle will win the race? Enter a color: ")
+
+    def ask_stake(self, balance):
+        stake = self.screen.numinput(title="Place your stake", prompt=f"How much do you bet? (1-{balance})",
+                                     default=min(10, balance), minval=1, maxval=balance)
+        return int(stake) if stake else 0
+
+    def replay(self, result):
+        for round_number in range(1, result.rounds + 1):
+            for turtle, track in zip(self.turtles, result.positions):
+                turtle.setx(track[round_number])
+            self.screen.update()
+            time.sleep(self.frame_delay)
+
+    def announce(self, winning_color, user_bet, detail=None):
+        self.message_turtle.goto(0, 0)  # Center
+        if winning_color == user_bet:
+            self.message_turtle.write("You Win!", align="center", font=("Arial", 120, "bold"))
+            print(f"You win! The {winning_color} is the winner!")
+        else:
+            self.message_turtle.write(f"You lose! The {winning_color} turtle is the winner!")
+            print(f"You lose! The {winning_color} is the winner!")
+        if detail:
+            self.message_turtle.goto(0, -150)
+            self.message_turtle.write(detail, align="center", font=("Arial", 16, "normal"))
+            print(detail)
+        self.screen.update()
+
+    def close_on_click(self):
+        self.screen.exitonclick()
+
+
+class ConsoleRaceView:
+    """Text-only stand-in for TurtleRaceView: prompts through game_input and prints the result."""
+    def __init__(self, colors=RAINBOW_COLORS):
+        self.colors = colors
+        self.turtles = colors  # One racer per color, as in the turtle window
+
+    def ask_bet(self, odds, balance):
+        print("Odds: " + " | ".join(f"{color} {price}" for color, price in odds.items()))
+        print(f"Balance: {balance}")
+        return ask("Which turtle will win the race? Enter a color: ", text)
+
+    def ask_stake(self, balance):
+        return ask(f"How much do you bet? (1-{balance}) ",
+                   integer(1, balance, message="Invalid input. Please enter a number.",
+                           range_message=f"Please enter a stake between 1 and {balance}."))
+
+    def replay(self, result):
+        leader = max(range(len(self.colors)), key=lambda racer: result.positions[racer][-1])
+        print(f"The race is over after {result.rounds} rounds (furthest: {self.colors[leader]}).")
+
+    def announce(self, winning_color, user_bet, detail=None):
+        if winning_color == user_bet:
+            print(f"You win! The {winning_color} is the winner!")
+        else:
+            print(f"You lose! The {winning_color} is the winner!")
+        if detail:
+            print(detail)
+
+    def close_on_click(self):
+        pass
+
+
+def play(rng=random, view=None):
+    """
+    Asks for a bet, shows the race, announces the result and settles the bet.
+    `rng` moves the racers (pass a seeded random.Random to make a race
+    reproducible); `view` defaults to a turtle window.
+    """
+    from race_betting import Bankroll, decimal_odds, win_probabilities  # Imports this module
+
+    view = view if view is not None else TurtleRaceView()
+    odds = dict(zip(RAINBOW_COLORS, decimal_odds(win_probabilities(len(view.turtles)))))
+    bankroll = Bankroll()
+    if bankroll.balance <= 0:
+        bankroll.reset()
+    user_bet = view.ask_bet(odds, bankroll.balance)
+
+    # Start race if user placed a bet
+    if user_bet:
+        stake = view.ask_stake(bankroll.balance) if odds.get(user_bet) else 0
+        result = run_race(len(view.turtles), rng, keep_positions=True)
+        view.replay(result)
+
+        winning_color = RAINBOW_COLORS[result.winner]
+        detail = None
+        if stake:
+            net = bankroll.settle(stake, odds[user_bet], winning_color == user_bet)
+            detail = f"{'Won' if net >= 0 else 'Lost'} {abs(net)} at {odds[user_bet]} - balance: {bankroll.balance}"
+        view.announce(winning_color, user_bet, detail)
+    view.close_on_click()
+
+
+def play_console(rng=random):
+    """Plays a race with betting entirely in the terminal."""
+    play(rng, ConsoleRaceView())
+
+
+def run_headless(num_races, rng=random):
+    """Runs `num_races` races without graphics and prints how often each color won."""
+    wins = [0] * len(RAINBOW_COLORS)
+    started = time.perf_counter()
+    for _ in range(num_races):
+        wins[run_race(rng=rng).winner] += 1
+    elapsed = time.perf_counter() - started
+
+    for color, count in zip(RAINBOW_COLORS, wins):
+        print(f"{color:>7}: {count:>8} wins ({count / num_races:.2%})")
+    print(f"{num_races} races in {elapsed:.2f}s ({num_races / elapsed:,.0f} races/sec)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turtle race with betting.")
+    parser.add_argument("--headless", type=int, metavar="RACES",
+                        help="run this many races without a window and print the results")
+    parser.add_argument("--console", action="store_true", help="play in the terminal instead of a window")
+    args = parser.parse_args()
+
+    if args.headless:
+        run_headless(args.headless)
+    elif args.console:
+        play_console()
+    else:
+        play()
+
 
-# Set up the screen
-race_on = False
-screen = Screen()
-screen.setup(width=600, height=400)
-user_bet = screen.textinput(title="Make your bet", prompt="Which turtle will win the race? Enter a color: ")
-rainbow_colors = ["red", "orange", "yellow", "green", "blue", "purple"]
-y_positions = [-70, -40, -10, 20, 50, 80]
-all_turtles = []
-
-# Rules
-for turtle_index in range(0, 6):
-    new_turtle = Turtle(shape="turtle")
-    new_turtle.color(rainbow_colors[turtle_index])
-    new_turtle.penup()
-    new_turtle.goto(-230, y_positions[turtle_index])
-    all_turtles.append(new_turtle)
-
-# Start race if user placed a bet
-if user_bet:
-    race_on = True
-
-while race_on:
-    for turtle in all_turtles:
-        rand_distance = random.randint(0, 10)
-        turtle.forward(rand_distance)
-
-        # Check if the turtle crosses the finish line
-        if turtle.xcor() > 260:
-            race_on = False
-            winning_color = turtle.color()[0]
-
-            #Create separate turtle to display the result
-            message_turtle = Turtle()
-            message_turtle.hideturtle()
-            message_turtle.penup()
-            message_turtle.goto(0, 0) #Center
-
-            if winning_color == user_bet:
-                message_turtle.write("You Win!", align="center", font=("Arial", 120, "bold"))
-                print(f"You win! The {winning_color} is the winner!")
-            else:
-                message_turtle.write(f"You lose! The {winning_color} turtle is the winner!")
-                print(f"You lose! The {winning_color} is the winner!")
-
-screen.exitonclick()
\ No newline at end of file
+if __name__ == "__main__":
+    main()